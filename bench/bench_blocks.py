@@ -0,0 +1,99 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from htmlnode import *
+
+# the block pipeline as it was before single-pass dispatch, kept for comparison
+def legacy_block_to_block_type(text):
+    if (text.startswith("# ")
+        or text.startswith("## ")
+        or text.startswith("### ")
+        or text.startswith("#### ")
+        or text.startswith("##### ")
+        or text.startswith("###### ")):
+        return "heading"
+    if text.startswith("```") and text.endswith("```"):
+        return "code"
+    if all(line.startswith(">") for line in text.split("\n")):
+        return "quote"
+    if all(line.startswith("* ") for line in text.split("\n")):
+        return "unordered_list"
+    if all(line.startswith("- ") for line in text.split("\n")):
+        return "unordered_list"
+    if text.startswith("1. "):
+        i = 1
+        for line in text.split("\n"):
+            if not line.startswith(f"{i}. "):
+                return "paragraph"
+            i += 1
+        return "ordered_list"
+    return "paragraph"
+
+def legacy_markdown_to_html_node(markdown):
+    blocks = markdown_to_blocks(markdown)
+    parent = ParentNode(tag="div", children=[], props=None)
+    for block in blocks:
+        block_type = legacy_block_to_block_type(block)
+        if isinstance(text_to_children(block, block_type), list):
+            parent.children.extend(text_to_children(block, block_type))
+        else:
+            parent.children.append(text_to_children(block, block_type))
+    return parent
+
+SECTION = """## Section {n}
+
+This is **bolded** paragraph number {n} with *italic* text, `code` and a [link](/page/{n})
+that continues on a second line with ![an image](/images/{n}.png)
+
+> A quote about section {n}
+> that spans two lines
+
+* first item
+* second item with **bold**
+* third item
+
+1. one
+2. two
+3. three
+
+```
+code sample {n}
+```
+"""
+
+def large_document(sections=500):
+    return "# Benchmark\n\n" + "\n".join(SECTION.format(n=n) for n in range(sections))
+
+# mean block typing cost with extra block types registered on first characters the
+# document never starts a block with; registry dispatch should keep it flat
+def block_typing_cost(blocks, extra_types, repeat=5):
+    names = [f"extra_{n}" for n in range(extra_types)]
+    for n, name in enumerate(names):
+        register_block_type(name, paragraph_node, lambda text: text.startswith("@@"), chr(0x2100 + n))
+    try:
+        seconds = min(timeit.repeat(lambda: [block_to_block_type(block) for block in blocks], number=1, repeat=repeat))
+    finally:
+        for name in names:
+            unregister_block_type(name)
+    return seconds / len(blocks)
+
+
+def main():
+    markdown = large_document()
+    assert legacy_markdown_to_html_node(markdown).to_html() == markdown_to_html_node(markdown).to_html()
+    repeat = 5
+    legacy = min(timeit.repeat(lambda: legacy_markdown_to_html_node(markdown), number=1, repeat=repeat))
+    current = min(timeit.repeat(lambda: markdown_to_html_node(markdown), number=1, repeat=repeat))
+    print(f"document: {len(markdown) / 1024:.0f} KiB, {len(markdown_to_blocks(markdown))} blocks")
+    print(f"legacy double dispatch: {legacy * 1000:8.2f} ms")
+    print(f"single-pass dispatch:   {current * 1000:8.2f} ms")
+    print(f"speedup:                {legacy / current:8.2f}x")
+    blocks = markdown_to_blocks(markdown)
+    for extra_types in (0, 10, 100):
+        print(f"block typing, {extra_types:>3} extra types: {block_typing_cost(blocks, extra_types) * 1e9:8.0f} ns/block")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import htmlnode
+from htmlnode import markdown_to_html_node
+import corpus
+
+# an all-text corpus: plain paragraphs, so nearly every leaf is a text node and none
+# of them has anything to escape
+def text_document(rng, blocks):
+    return "\n\n".join(corpus.paragraph(rng) for _ in range(blocks)) + "\n"
+
+def render(documents):
+    for document in documents:
+        markdown_to_html_node(document).to_html()
+
+# "unescaped" swaps the per-block escape for a no-op, which is how pages rendered
+# before escaping; both run in every repetition, with the collector off like timeit,
+# and the best time of each is kept
+def time_render(documents, repeat):
+    escape_text = htmlnode.escape_text
+    modes = {"unescaped": lambda text: text, "escaped": escape_text}
+    best = dict.fromkeys(modes, float("inf"))
+    try:
+        for _ in range(repeat):
+            for name, escape in modes.items():
+                htmlnode.escape_text = escape
+                gc.disable()
+                started = time.perf_counter()
+                render(documents)
+                best[name] = min(best[name], time.perf_counter() - started)
+                gc.enable()
+    finally:
+        htmlnode.escape_text = escape_text
+    return best["unescaped"], best["escaped"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of html escaping when rendering an all-text corpus.")
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--blocks", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    documents = [text_document(rng, args.blocks) for _ in range(args.documents)]
+
+    unescaped, escaped = time_render(documents, args.repeat)
+    print(f"render, unescaped: {unescaped * 1000:10.1f} ms")
+    print(f"render, escaped:   {escaped * 1000:10.1f} ms  ({escaped / unescaped - 1:+.1%})")
+
+if __name__ == "__main__":
+    main()
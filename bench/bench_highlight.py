@@ -0,0 +1,67 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from main import generate_pages_recursive, use_block_cache
+import highlight
+import corpus
+
+# pages whose code blocks are drawn from a small pool of snippets, like docs that
+# repeat the same examples on many pages
+def write_pages(content, pages, snippets, fence, seed):
+    rng = random.Random(seed)
+    pool = [corpus.code_block(rng, 30).replace("```\n", f"{fence}\n", 1) for _ in range(snippets)]
+    for n in range(pages):
+        directory = os.path.join(content, f"page{n}")
+        os.makedirs(directory)
+        blocks = [f"# Page {n}"] + [rng.choice(pool) if i % 3 == 0 else corpus.paragraph(rng) for i in range(30)]
+        with open(os.path.join(directory, "index.md"), "w", encoding="utf-8") as file:
+            file.write("\n\n".join(blocks) + "\n")
+
+def build(root, content):
+    out = os.path.join(root, "public")
+    started = time.perf_counter()
+    failures = generate_pages_recursive(content, os.path.join(root, "template.html"), out)
+    elapsed = time.perf_counter() - started
+    assert not failures
+    shutil.rmtree(out)
+    return elapsed
+
+# the block cache is off so every code block reaches the highlighter; "warm" starts
+# from the highlight cache file a previous build saved
+def main():
+    parser = argparse.ArgumentParser(description="Time builds with code highlighting cold, warm and off.")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--snippets", type=int, default=40, help="distinct code snippets shared by all pages (default: 40)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    use_block_cache(0)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        corpus.write_site(root, 1)
+        cache_path = os.path.join(root, "highlight.json")
+        for name, fence in (("plain", "```"), ("python", "```python")):
+            content = os.path.join(root, name)
+            write_pages(content, args.pages, args.snippets, fence, args.seed)
+            highlight.highlight_cache = None
+            results[f"{name}, no cache"] = build(root, content)
+            if name == "python":
+                highlight.use_highlight_cache()
+                results["python, cold cache"] = build(root, content)
+                highlight.highlight_cache.save(cache_path)
+                highlight.use_highlight_cache(cache_path)
+                results["python, warm cache"] = build(root, content)
+
+    baseline = results["plain, no cache"]
+    for name, elapsed in results.items():
+        print(f"{name:<22}{elapsed * 1000:10.1f} ms{elapsed / baseline - 1:+10.1%}")
+
+if __name__ == "__main__":
+    main()
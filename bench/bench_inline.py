@@ -0,0 +1,38 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from htmlnode import *
+
+# the chained five-pass pipeline that text_to_textnodes used before the single-pass tokenizer
+def legacy_text_to_textnodes(text):
+    output_nodes = [TextNode(text, TextType.TEXT)]
+    output_nodes = split_nodes_delimiter(output_nodes, "**", TextType.BOLD)
+    output_nodes = split_nodes_delimiter(output_nodes, "*", TextType.ITALIC)
+    output_nodes = split_nodes_delimiter(output_nodes, "`", TextType.CODE)
+    output_nodes = split_nodes_image(output_nodes)
+    output_nodes = split_nodes_link(output_nodes)
+    return output_nodes
+
+def link_dense_paragraph(links=400):
+    return " ".join(
+        f"see [post number {n}](/posts/{n}) with **bold {n}** and ![thumb {n}](/images/{n}.png)"
+        for n in range(links)
+    )
+
+
+def main():
+    text = link_dense_paragraph()
+    assert legacy_text_to_textnodes(text) == text_to_textnodes(text)
+    repeat = 5
+    legacy = min(timeit.repeat(lambda: legacy_text_to_textnodes(text), number=5, repeat=repeat)) / 5
+    current = min(timeit.repeat(lambda: text_to_textnodes(text), number=5, repeat=repeat)) / 5
+    print(f"paragraph: {len(text) / 1024:.0f} KiB, {len(text_to_textnodes(text))} inline nodes")
+    print(f"chained split passes: {legacy * 1000:8.2f} ms")
+    print(f"single-pass tokenizer: {current * 1000:7.2f} ms")
+    print(f"speedup:              {legacy / current:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from htmlnode import *
+from bench_blocks import large_document
+
+MIB = 1024 * 1024
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+    return count
+
+# peak and retained tracemalloc memory for parsing about size_mib of markdown into a node tree
+def measure(size_mib=1):
+    markdown = large_document(1)
+    markdown = large_document(int(size_mib * MIB / len(markdown)))
+    gc.collect()
+    tracemalloc.start()
+    text_nodes = [text_to_textnodes(block) for block in markdown_to_blocks(markdown) if block_to_block_type(block) == "paragraph"]
+    _, text_peak = tracemalloc.get_traced_memory()
+    del text_nodes
+    tracemalloc.reset_peak()
+    node = markdown_to_html_node(markdown)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(markdown) / MIB, count_nodes(node), text_peak, peak, retained
+
+# peak memory for scanning blocks straight from a file; it should stay flat as size_mib grows
+def measure_block_scan(size_mib=8):
+    markdown = large_document(1)
+    markdown = large_document(int(size_mib * MIB / len(markdown)))
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as file:
+        file.write(markdown)
+        del markdown
+        file.seek(0)
+        gc.collect()
+        tracemalloc.start()
+        blocks = sum(1 for _ in iter_blocks(file))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return blocks, peak
+
+# peak memory for generating one page from a size_mib markdown file; streaming keeps it
+# near the size of the largest block
+def measure_generate_page(size_mib=8):
+    from main import generate_page, use_block_cache
+    use_block_cache(0)
+    markdown = large_document(1)
+    markdown = large_document(int(size_mib * MIB / len(markdown)))
+    with tempfile.TemporaryDirectory() as root:
+        source = os.path.join(root, "index.md")
+        with open(source, "w", encoding="utf-8") as file:
+            file.write("# Reference\n\n" + markdown)
+        del markdown
+        template = os.path.join(root, "template.html")
+        with open(template, "w") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+        gc.collect()
+        tracemalloc.start()
+        generate_page(source, template, os.path.join(root, "public"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+# the same for a build with a manifest, dependency graph and site index; they gather
+# references and metadata while the page renders, so the source is never held whole and
+# what grows with the file is only the urls and distinct words they record
+def measure_build(size_mib=8):
+    from depgraph import DependencyGraph
+    from main import generate_pages_recursive, use_block_cache
+    from manifest import BuildManifest
+    from siteindex import SiteIndex
+    use_block_cache(0)
+    markdown = large_document(1)
+    markdown = large_document(int(size_mib * MIB / len(markdown)))
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        os.makedirs(content)
+        with open(os.path.join(content, "index.md"), "w", encoding="utf-8") as file:
+            file.write("# Reference\n\n" + markdown)
+        del markdown
+        template = os.path.join(root, "template.html")
+        with open(template, "w") as file:
+            file.write("<title>{{ Title }}</title>{{ Content }}")
+        state = os.path.join(root, ".build")
+        manifest = BuildManifest(os.path.join(state, "manifest.json"))
+        graph = DependencyGraph(os.path.join(state, "depgraph.json"))
+        site_index = SiteIndex(os.path.join(state, "siteindex.json"))
+        gc.collect()
+        tracemalloc.start()
+        generate_pages_recursive(content, template, os.path.join(root, "public"), manifest, graph=graph, static_dir=root, site_index=site_index)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    size, nodes, text_peak, peak, retained = measure()
+    print(f"markdown: {size:.2f} MiB, {nodes} HTML nodes")
+    print(f"text_to_textnodes peak per MiB:     {text_peak / MIB / size:6.2f} MiB")
+    print(f"markdown_to_html_node peak per MiB: {peak / MIB / size:6.2f} MiB")
+    print(f"retained node tree per MiB:         {retained / MIB / size:6.2f} MiB")
+    for size in (1, 8):
+        blocks, peak = measure_block_scan(size)
+        print(f"iter_blocks over a {size} MiB file:    {peak / 1024:6.1f} KiB peak ({blocks} blocks)")
+    for size in (1, 8):
+        print(f"generate_page from a {size} MiB file:  {measure_generate_page(size) / 1024:6.1f} KiB peak")
+    for size in (1, 8):
+        print(f"build from a {size} MiB file:          {measure_build(size) / 1024:6.1f} KiB peak")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from frontmatter import scan_pages
+from main import generate_pages_recursive, use_block_cache
+import corpus
+
+# a metadata-only scan of every page against a full build of the same tree
+def main():
+    parser = argparse.ArgumentParser(description="Compare the front matter metadata scan with a full build.")
+    parser.add_argument("--pages", type=int, default=2000, help="pages in the generated tree (try 10000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        content = corpus.write_site(root, args.pages, with_front_matter=True)
+        started = time.perf_counter()
+        pages = scan_pages(content)
+        scan = time.perf_counter() - started
+        assert len(pages) == args.pages and all("tags" in metadata for metadata in pages.values())
+
+        use_block_cache(0)
+        out = os.path.join(root, "public")
+        started = time.perf_counter()
+        failures = generate_pages_recursive(content, os.path.join(root, "template.html"), out)
+        build = time.perf_counter() - started
+        assert not failures
+        shutil.rmtree(out)
+
+    print(f"pages:         {args.pages}")
+    print(f"metadata scan: {scan * 1000:10.1f} ms")
+    print(f"full build:    {build * 1000:10.1f} ms")
+    print(f"scan/build:    {scan / build:10.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+CASES = {
+    "import htmlnode": [sys.executable, "-c", "import htmlnode"],
+    "import main": [sys.executable, "-c", "import main"],
+    "main.py --help": [sys.executable, os.path.join(SRC_DIR, "main.py"), "--help"],
+}
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=SRC_DIR, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time interpreter startup plus module import for the generator.")
+    parser.add_argument("--runs", type=int, default=20)
+    # the default sits well above the ~100 ms these cases cost and well below the ~200 ms
+    # they cost while bulkio imported asyncio eagerly; pass 0 to only print timings
+    parser.add_argument("--max-ms", type=float, default=150, help="fail if any case's median exceeds the bare interpreter by more than this (default: 150, 0 disables)")
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"{'python -c pass':<20}{baseline:8.1f} ms")
+    regressions = []
+    for name, command in CASES.items():
+        median = time_command(command, args.runs)
+        overhead = median - baseline
+        print(f"{name:<20}{median:8.1f} ms  (+{overhead:.1f} ms)")
+        if args.max_ms and overhead > args.max_ms:
+            regressions.append(name)
+    if regressions:
+        sys.exit(f"startup regression: {', '.join(regressions)} over {args.max_ms} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in secret by the dark lord sauron in the fires of mount doom "
+    "elves dwarves and men received rings of their own while hobbits lived quietly in the shire "
+    "gandalf the grey wandered middle earth counselling kings and stewards against the shadow"
+).split()
+
+# deterministic markdown generators: the same seed always yields the same corpus
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def paragraph(rng, sentences=4):
+    parts = []
+    for _ in range(sentences):
+        sentence = words(rng, rng.randint(6, 14))
+        roll = rng.random()
+        if roll < 0.2:
+            sentence += f" **{words(rng, 2)}**"
+        elif roll < 0.4:
+            sentence += f" *{words(rng, 2)}*"
+        elif roll < 0.5:
+            sentence += f" `{rng.choice(WORDS)}()`"
+        parts.append(sentence.capitalize() + ".")
+    return " ".join(parts)
+
+def link_dense(rng, links=50):
+    parts = []
+    for n in range(links):
+        parts.append(f"{words(rng, 3)} [{words(rng, 2)}](/posts/{rng.randint(0, 9999)})")
+        if n % 5 == 0:
+            parts.append(f"![{words(rng, 2)}](/images/{rng.randint(0, 999)}.png)")
+    return " ".join(parts)
+
+def unordered_list(rng, items=6):
+    return "\n".join(f"* {words(rng, rng.randint(3, 8))}" for _ in range(items))
+
+def ordered_list(rng, items=6):
+    return "\n".join(f"{n}. {words(rng, rng.randint(3, 8))}" for n in range(1, items + 1))
+
+def quote(rng, lines=3):
+    return "\n".join(f"> {words(rng, rng.randint(5, 10))}" for _ in range(lines))
+
+def code_block(rng, lines=40):
+    body = "\n".join(f"    value_{n} = compute({rng.randint(0, 100)}, \"{rng.choice(WORDS)}\")" for n in range(lines))
+    return f"```\ndef generated():\n{body}\n```"
+
+def document(rng, blocks=60):
+    parts = [f"# {words(rng, 4).title()}"]
+    makers = (paragraph, paragraph, paragraph, unordered_list, ordered_list, quote, code_block, link_dense)
+    for n in range(blocks):
+        if n % 12 == 0:
+            parts.append(f"## {words(rng, 3).title()}")
+        maker = rng.choice(makers)
+        parts.append(maker(rng, 5) if maker is code_block else maker(rng))
+    return "\n\n".join(parts) + "\n"
+
+def front_matter(rng, n):
+    tags = ", ".join(sorted({rng.choice(WORDS) for _ in range(3)}))
+    return f"---\ntitle: \"{words(rng, 4).title()}\"\ndate: 2024-{n % 12 + 1:02d}-{n % 28 + 1:02d}\ntags: [{tags}]\n---\n"
+
+def write_site(root, pages, seed=0, blocks=30, fanout=20, with_front_matter=False):
+    # pages are spread over nested directories, fanout per level, like a real blog tree
+    rng = random.Random(seed)
+    content = os.path.join(root, "content")
+    for n in range(pages):
+        parts = []
+        remaining = n
+        while remaining:
+            parts.append(f"d{remaining % fanout}")
+            remaining //= fanout
+        directory = os.path.join(content, *parts, f"page{n}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "index.md"), "w", encoding="utf-8") as file:
+            if with_front_matter:
+                file.write(front_matter(rng, n))
+            file.write(document(rng, blocks))
+    os.makedirs(os.path.join(root, "static"), exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), "w") as file:
+        file.write("body { font-family: serif; }\n")
+    with open(os.path.join(root, "template.html"), "w") as file:
+        file.write("<!DOCTYPE html>\n<html><head><title>{{ Title }}</title></head><body><article>{{ Content }}</article></body></html>\n")
+    return content
@@ -0,0 +1,142 @@
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from main import generate_pages_recursive, refresh_public_folder, use_block_cache
+from postprocess import postprocess
+import corpus
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# the server every run is compared against, and the bundled one
+SERVERS = {
+    "http.server": lambda root, port, threads: [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1", "--directory", root],
+    "main.py host": lambda root, port, threads: [sys.executable, os.path.join(SRC_DIR, "main.py"), "host", "--out", root, "--host", "127.0.0.1", "--port", str(port), "--threads", str(threads), "-q"],
+}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server on port {port} did not start")
+
+def build_site(root, pages):
+    content = corpus.write_site(root, pages)
+    public = os.path.join(root, "public")
+    use_block_cache(0)
+    refresh_public_folder(os.path.join(root, "static"), public)
+    failures = generate_pages_recursive(content, os.path.join(root, "template.html"), public)
+    if failures:
+        raise RuntimeError(f"benchmark build failed: {failures[0]}")
+    postprocess(public, ["index.css"], fingerprint=False, compress=True)
+    urls = ["/index.css"]
+    for directory, _, files in os.walk(public):
+        if "index.html" in files:
+            relative = os.path.relpath(directory, public)
+            urls.append("/" if relative == "." else "/" + relative.replace(os.sep, "/") + "/")
+    return public, urls
+
+# each client thread keeps one connection open while the server allows it, and
+# records the latency of every request
+def run_load(host, port, urls, clients, requests, seed, headers):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed + index)
+        connection = None
+        local = []
+        try:
+            for _ in range(requests // clients):
+                if connection is None:
+                    connection = http.client.HTTPConnection(host, port, timeout=10)
+                started = time.perf_counter()
+                connection.request("GET", rng.choice(urls), headers=headers)
+                response = connection.getresponse()
+                response.read()
+                local.append(time.perf_counter() - started)
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+                if response.will_close:
+                    connection.close()
+                    connection = None
+        except Exception as e:
+            errors.append(e)
+        finally:
+            if connection is not None:
+                connection.close()
+            with lock:
+                latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000 if latencies else 0.0,
+    }
+
+def report(name, result):
+    print(f"{name:<16}{result['rps']:10.0f} req/s{result['p50_ms']:10.2f} ms p50{result['p99_ms']:10.2f} ms p99  ({result['requests']} requests, {result['errors']} errors)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the static server against python -m http.server on a generated site.")
+    parser.add_argument("--url", help="load-test an already running server at this base url instead (paths come from --pages)")
+    parser.add_argument("--pages", type=int, default=100, help="pages in the generated site (default: 100)")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent client connections, more than --threads so idle keep-alive connections cannot hide behind a thread each (default: 64)")
+    parser.add_argument("--requests", type=int, default=5000, help="total requests per server (default: 5000)")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads for main.py host (default: 16)")
+    parser.add_argument("--gzip", action="store_true", help="send Accept-Encoding: gzip")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+
+    with tempfile.TemporaryDirectory() as root:
+        public, urls = build_site(root, args.pages)
+        if args.url:
+            parts = urlsplit(args.url)
+            report(args.url, run_load(parts.hostname, parts.port or 80, urls, args.clients, args.requests, args.seed, headers))
+            return
+        for name, command in SERVERS.items():
+            port = free_port()
+            process = subprocess.Popen(command(public, port, args.threads), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                wait_for_port(port)
+                # one warm-up pass so both servers start with hot caches
+                run_load("127.0.0.1", port, urls, 1, len(urls), args.seed, headers)
+                report(name, run_load("127.0.0.1", port, urls, args.clients, args.requests, args.seed, headers))
+            finally:
+                process.terminate()
+                process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+# absolute, since builds run from inside their temporary directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from htmlnode import *
+from main import main as build_main
+import corpus
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# each case takes a seeded Random and returns the callable to time; setup stays untimed
+
+def case_split_nodes_delimiter(rng):
+    nodes = [TextNode(corpus.paragraph(rng, 400), TextType.TEXT)]
+    return lambda: split_nodes_delimiter(nodes, "**", TextType.BOLD)
+
+def case_split_nodes_image(rng):
+    nodes = [TextNode(corpus.link_dense(rng, 500), TextType.TEXT)]
+    return lambda: split_nodes_image(nodes)
+
+def case_split_nodes_link(rng):
+    nodes = [TextNode(corpus.link_dense(rng, 500), TextType.TEXT)]
+    return lambda: split_nodes_link(nodes)
+
+def case_text_to_textnodes(rng):
+    text = corpus.link_dense(rng, 200) + " " + corpus.paragraph(rng, 200)
+    return lambda: text_to_textnodes(text)
+
+def case_markdown_to_blocks(rng):
+    markdown = corpus.document(rng, 3000)
+    return lambda: markdown_to_blocks(markdown)
+
+def case_markdown_to_html_node(rng):
+    markdown = corpus.document(rng, 500)
+    return lambda: markdown_to_html_node(markdown)
+
+def case_giant_code_block(rng):
+    markdown = corpus.code_block(rng, 20000)
+    return lambda: markdown_to_html_node(markdown)
+
+def case_parent_to_html(rng):
+    node = markdown_to_html_node(corpus.document(rng, 1000))
+    return node.to_html
+
+CASES = {
+    "split_nodes_delimiter": case_split_nodes_delimiter,
+    "split_nodes_image": case_split_nodes_image,
+    "split_nodes_link": case_split_nodes_link,
+    "text_to_textnodes": case_text_to_textnodes,
+    "markdown_to_blocks": case_markdown_to_blocks,
+    "markdown_to_html_node": case_markdown_to_html_node,
+    "giant_code_block": case_giant_code_block,
+    "ParentNode.to_html": case_parent_to_html,
+}
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+# builds run through main() as the command line does, so the manifest, dependency graph,
+# site index and postprocessing are timed along with rendering; a full build starts from
+# nothing each time, and a no-op build follows one that already built every page
+def time_build(root, pages, workers, repeat, noop=False):
+    content = corpus.write_site(root, pages)
+    argv = [
+        "build", "--content", content, "--static", os.path.join(root, "static"),
+        "--template", os.path.join(root, "template.html"), "--out", os.path.join(root, "public"),
+        "-j", str(workers), "--block-cache-size", "0", "--site-url", "https://example.com",
+        # the corpus links to pages that do not exist, and every broken link is a warning
+        "--log-level", "ERROR",
+    ]
+    if not noop:
+        argv.append("--full")
+    cwd = os.getcwd()
+    # build state goes to .build in the working directory
+    os.chdir(root)
+    try:
+        if noop:
+            build_main(argv)
+        return best_of(lambda: build_main(argv), repeat)
+    finally:
+        os.chdir(cwd)
+
+
+def run(args):
+    results = {}
+    for name, case in CASES.items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = best_of(case(random.Random(args.seed)), args.repeat)
+        print(f"{name:<28}{results[name] * 1000:10.2f} ms")
+    build_cases = {f"build_{args.pages}_pages_serial": (1, False), f"noop_build_{args.pages}_pages": (1, True)}
+    if args.jobs > 1:
+        build_cases[f"build_{args.pages}_pages_j{args.jobs}"] = (args.jobs, False)
+    for name, (workers, noop) in build_cases.items():
+        if args.only and args.only not in name:
+            continue
+        with tempfile.TemporaryDirectory() as root:
+            results[name] = time_build(root, args.pages, workers, max(1, args.repeat // 2), noop)
+        print(f"{name:<28}{results[name] * 1000:10.2f} ms")
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        ratio = seconds / baseline[name]
+        marker = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print(f"{name:<28}{ratio:8.2f}x baseline{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown pipeline on a deterministic synthetic corpus.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the fastest one counts")
+    parser.add_argument("--pages", type=int, default=200, help="pages in the end-to-end build tree (try 10000)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="workers for the parallel build case")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help=f"results to compare against (default: {BASELINE_PATH})")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown over the baseline before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    results = run(args)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=1)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    print()
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        sys.exit(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+CACHE_VERSION = 3
+
+
+def block_key(block, block_type):
+    return hashlib.blake2b(f"{block_type}\0{block}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+# LRU of rendered html fragments keyed by block_key; size is bounded by the characters
+# held in keys and fragments, not by the number of entries
+class BlockCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.new_entries = {}
+
+    def get(self, key):
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, key, html, new=True):
+        entry_size = len(key) + len(html)
+        if entry_size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.size -= len(key) + len(self.entries.pop(key))
+        self.entries[key] = html
+        self.size += entry_size
+        if new:
+            self.new_entries[key] = html
+        while self.size > self.max_bytes:
+            old_key, old_html = self.entries.popitem(last=False)
+            self.size -= len(old_key) + len(old_html)
+            self.new_entries.pop(old_key, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+        }
+
+    # hands a worker's counters (and optionally its new entries) back to the parent
+    # process, then resets them so the next page reports only its own work
+    def drain(self, include_entries=False):
+        result = {"hits": self.hits, "misses": self.misses, "entries": self.new_entries if include_entries else {}}
+        self.hits = 0
+        self.misses = 0
+        self.new_entries = {}
+        return result
+
+    def merge(self, drained):
+        self.hits += drained["hits"]
+        self.misses += drained["misses"]
+        for key, html in drained["entries"].items():
+            self.put(key, html)
+
+    def load(self, path):
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        if data.get("version") != CACHE_VERSION:
+            return self
+        for key, html in data.get("entries", []):
+            self.put(key, html, new=False)
+        return self
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": CACHE_VERSION, "entries": list(self.entries.items())}, file)
+        os.replace(temp_path, path)
+        self.new_entries = {}
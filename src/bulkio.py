@@ -0,0 +1,103 @@
+import contextlib
+import os
+import shutil
+
+DEFAULT_CONCURRENCY = 8
+
+
+# the file only appears under path once it is complete, so a reader (or the web
+# server) sees either the previous version or the new one, never a partial write
+@contextlib.contextmanager
+def atomic_open(path, mode="w", encoding="utf-8"):
+    temp_path = path + ".tmp"
+    if "b" in mode:
+        encoding = None
+    try:
+        with open(temp_path, mode, encoding=encoding) as file:
+            yield file
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+def write_atomic(path, text):
+    with atomic_open(path) as file:
+        file.write(text)
+
+def copy_atomic(source_path, destination_path):
+    temp_path = destination_path + ".tmp"
+    try:
+        shutil.copy2(source_path, temp_path)
+        os.replace(temp_path, destination_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+def read_text(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+class BulkIO:
+    # blocking file operations run on a bounded thread pool driven by an asyncio event
+    # loop, so many reads and writes are in flight at once; CPU work handed to pipeline()
+    # stays on the calling thread. asyncio and the executor are imported where they are
+    # used, so importing this module for the atomic helpers stays cheap
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.concurrency = max(1, concurrency)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulkio")
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def _run(self, limit, function, *args):
+        import asyncio
+
+        async with limit:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _map(self, function, items):
+        import asyncio
+
+        limit = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._run(limit, function, *item) for item in items))
+
+    # calls function(*item) for every item concurrently; results come back in order and
+    # the first exception is raised like Executor.map
+    def map(self, function, items):
+        import asyncio
+
+        return asyncio.run(self._map(function, items))
+
+    async def _pipeline(self, items, read, process, write):
+        import asyncio
+
+        io_limit = asyncio.Semaphore(self.concurrency)
+        # bounds how many items are read but not yet written, which bounds memory
+        in_flight = asyncio.Semaphore(self.concurrency * 2)
+
+        async def handle(item):
+            async with in_flight:
+                data = await self._run(io_limit, read, item)
+                result = process(item, data)
+                await self._run(io_limit, write, item, result)
+
+        return await asyncio.gather(*(handle(item) for item in items), return_exceptions=True)
+
+    # read(item) and write(item, result) run on the thread pool, process(item, data) runs
+    # on the event loop thread between them; returns one error (or None) per item, in order
+    def pipeline(self, items, read, process, write):
+        import asyncio
+
+        results = asyncio.run(self._pipeline(items, read, process, write))
+        return [result if isinstance(result, BaseException) else None for result in results]
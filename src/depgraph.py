@@ -0,0 +1,200 @@
+import json
+import os
+import posixpath
+from urllib.parse import urlsplit
+
+from bulkio import atomic_open
+from htmlnode import iter_blocks, block_to_block_type, extract_markdown_images, extract_markdown_links
+from manifest import hash_file
+
+GRAPH_VERSION = 2
+# dependencies whose state is a file's [size, mtime_ns, content hash]
+FILE_KINDS = ("template", "assets")
+
+
+# None for a missing file; like file_unchanged in main, the file is hashed again only
+# when its size or mtime differs from the recorded state
+def file_state(path, recorded=None):
+    try:
+        stat = os.stat(path)
+        if recorded is not None and recorded[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return recorded
+        return [stat.st_size, stat.st_mtime_ns, hash_file(path)]
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+# files are compared by content, so touching one without changing it rebuilds nothing
+def same_state(kind, current, recorded):
+    if kind in FILE_KINDS and current is not None and recorded is not None:
+        return current[2] == recorded[2]
+    return current == recorded
+
+# adds the image and link urls of one block to images and links; code blocks have none
+def block_references(block, block_type, images, links):
+    if block_type == "code":
+        return
+    images.extend(url for _, url in extract_markdown_images(block))
+    links.extend(url for _, url in extract_markdown_links(block))
+
+# image and link urls of a markdown source, leaving out code blocks
+def markdown_references(markdown):
+    images = []
+    links = []
+    for _, block in iter_blocks(markdown):
+        block_references(block, block_to_block_type(block), images, links)
+    return images, links
+
+# "/", "/blog/post/", "blog/post" and "/blog/post/index.html" all name the same page
+def url_key(path):
+    path = path.strip("/")
+    if path == "index.html" or path.endswith("/index.html"):
+        path = path[:-len("index.html")].rstrip("/")
+    return path
+
+def page_url(dest_path, dest_root):
+    relative = os.path.relpath(dest_path, dest_root)
+    return "" if relative == "." else relative.replace(os.sep, "/")
+
+# the url_key a url in the page at from_url points to; None for external urls and
+# same-page anchors
+def reference_key(url, from_url):
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    return url_key(posixpath.normpath(posixpath.join("/" + from_url, parts.path)))
+
+# ("page", source path), ("asset", static file path) or ("broken", None)
+def resolve_key(key, pages_by_url, static_dir):
+    if key in pages_by_url:
+        return "page", pages_by_url[key]
+    asset = os.path.join(static_dir, *key.split("/"))
+    if key and os.path.isfile(asset):
+        return "asset", asset
+    return "broken", None
+
+
+class DependencyGraph:
+    # for every page: the template, static assets and other pages it references, with
+    # the state each had when the page was built (size, mtime and content hash for the
+    # template and assets, whether the page exists for linked pages, whether a missing target has
+    # appeared since), plus the references that could not be resolved
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.pages_by_url = {}
+        self.static_dir = None
+        self._existing = set()
+        self._states = {}
+        self._recorded = {}
+        self._resolved = {}
+        # a graph that was not loaded has never been written
+        self.changed = True
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        if data.get("version") != GRAPH_VERSION:
+            return self
+        self.pages = data.get("pages", {})
+        self.changed = False
+        return self
+
+    # written compactly, and only when an entry changed since it was loaded
+    def save(self):
+        if not self.changed:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_open(self.path) as file:
+            json.dump({"version": GRAPH_VERSION, "pages": self.pages}, file, separators=(",", ":"))
+        self.changed = False
+
+    # pages_by_url maps url_key(page url) to the source of every page in this build;
+    # entries for pages that no longer exist are dropped
+    def begin_build(self, pages_by_url, static_dir):
+        self.pages_by_url = pages_by_url
+        self.static_dir = static_dir
+        self._existing = set(pages_by_url.values())
+        self._states = {}
+        self._resolved = {}
+        pages = {page: entry for page, entry in self.pages.items() if page in self._existing}
+        if len(pages) != len(self.pages):
+            self.pages = pages
+            self.changed = True
+        self._recorded = {path: state for entry in self.pages.values() for kind in FILE_KINDS
+                          for path, state in entry["dependencies"][kind].items() if state is not None}
+
+    # resolve_key for a url key, once per build however many pages reference it
+    def resolve(self, key):
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            resolved = self._resolved[key] = resolve_key(key, self.pages_by_url, self.static_dir)
+        return resolved
+
+    # current state of a dependency, computed once per build
+    def state(self, kind, path):
+        if kind == "pages":
+            return path in self._existing
+        if kind == "missing":
+            return self.resolve(path)[0] != "broken"
+        if path not in self._states:
+            self._states[path] = file_state(path, self._recorded.get(path))
+        return self._states[path]
+
+    # template_files: the page's template and the partials it includes; images and links
+    # are the urls the page references, as block_references collects them
+    def record(self, page, template_files, images, links, from_url):
+        dependencies = {"template": {path: self.state("template", path) for path in template_files}, "assets": {}, "pages": {}, "missing": {}}
+        broken = []
+        for kind, urls in (("image", images), ("link", links)):
+            for url in urls:
+                key = reference_key(url, from_url)
+                if key is None:
+                    continue
+                target_kind, target = self.resolve(key)
+                if target_kind == "page":
+                    dependencies["pages"][target] = True
+                elif target_kind == "asset":
+                    dependencies["assets"][target] = self.state("assets", target)
+                else:
+                    # a broken reference is a dependency too: the page is rebuilt once it resolves
+                    dependencies["missing"][key] = False
+                    broken.append([kind, url])
+        entry = {"dependencies": dependencies, "broken": broken}
+        if self.pages.get(page) != entry:
+            self.pages[page] = entry
+            self.changed = True
+
+    def dependents(self, path):
+        return sorted(page for page, entry in self.pages.items()
+                      if any(path in targets for targets in entry["dependencies"].values()))
+
+    # pages that must be rebuilt because something they reference changed since their
+    # last build, or because they have no entry yet; pages that stay get the current
+    # stamps of their files recorded, so a touched file is hashed once, not every build
+    def invalidated(self):
+        stale = set()
+        for page in self._existing:
+            entry = self.pages.get(page)
+            if entry is None:
+                stale.add(page)
+                continue
+            dependencies = entry["dependencies"]
+            for kind, targets in dependencies.items():
+                if any(not same_state(kind, self.state(kind, path), state) for path, state in targets.items()):
+                    stale.add(page)
+                    break
+            else:
+                for kind in FILE_KINDS:
+                    current = {path: self.state(kind, path) for path in dependencies[kind]}
+                    if current != dependencies[kind]:
+                        dependencies[kind] = current
+                        self.changed = True
+        return stale
+
+    def broken_references(self):
+        return [(page, kind, url) for page, entry in sorted(self.pages.items()) for kind, url in entry["broken"]]
@@ -0,0 +1,230 @@
+import logging
+import mimetypes
+import os
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from template import load_template
+
+logger = logging.getLogger(__name__)
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    '<script>new EventSource("/__livereload").onmessage = function () { location.reload(); };</script>'
+)
+
+# the standard library has no inotify binding, so changes are found by polling mtimes
+def scan_mtimes(paths):
+    mtimes = {}
+    directories = []
+    for path in paths:
+        if os.path.isdir(path):
+            directories.append(path)
+        elif os.path.isfile(path):
+            mtimes[path] = os.stat(path).st_mtime_ns
+    while directories:
+        try:
+            entries = os.scandir(directories.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    else:
+                        mtimes[entry.path] = entry.stat().st_mtime_ns
+                except FileNotFoundError:
+                    pass
+    return mtimes
+
+
+class FileWatcher:
+    def __init__(self, paths):
+        self.paths = paths
+        self.mtimes = scan_mtimes(paths)
+
+    # returns the files that were added, removed or modified since the last poll
+    def poll(self):
+        mtimes = scan_mtimes(self.paths)
+        changed = {path for path in mtimes.keys() | self.mtimes.keys() if mtimes.get(path) != self.mtimes.get(path)}
+        self.mtimes = mtimes
+        return changed
+
+
+def inject_live_reload(html):
+    index = html.rfind("</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SCRIPT
+    return html[:index] + LIVE_RELOAD_SCRIPT + html[index:]
+
+def page_key(url_path):
+    key = url_path.strip("/")
+    if key == "index.html" or key.endswith("/index.html"):
+        key = key[:-len("index.html")].rstrip("/")
+    return key
+
+
+# keeps rendered pages and static files in memory; render_page(source) returns a page's
+# html and collect_pages() maps page keys ("" for the root, "majesty", ...) to sources
+class DevSite:
+    def __init__(self, static_dir, template_path, render_page, collect_pages):
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.render_page = render_page
+        self.collect_pages = collect_pages
+        self.sources = collect_pages()
+        self.pages = {}
+        self.assets = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+
+    def page(self, key):
+        with self.lock:
+            if key not in self.pages:
+                self.pages[key] = inject_live_reload(self.render_page(self.sources[key])).encode("utf-8")
+            return self.pages[key]
+
+    def asset(self, url_path):
+        static_root = os.path.realpath(self.static_dir)
+        file_path = os.path.realpath(os.path.join(static_root, url_path.lstrip("/")))
+        if not file_path.startswith(static_root + os.sep) or not os.path.isfile(file_path):
+            return None
+        with self.lock:
+            if file_path not in self.assets:
+                with open(file_path, "rb") as file:
+                    self.assets[file_path] = file.read()
+            return self.assets[file_path]
+
+    # returns (content type, body) or None when nothing lives at url_path
+    def get(self, url_path):
+        key = page_key(url_path)
+        if key in self.sources:
+            return "text/html; charset=utf-8", self.page(key)
+        body = self.asset(url_path)
+        if body is None:
+            return None
+        content_type, _ = mimetypes.guess_type(url_path)
+        return content_type or "application/octet-stream", body
+
+    # only the pages whose sources changed are rendered again; a change to the template
+    # or one of its partials drops every page so each one is rendered again the next
+    # time it is requested
+    def apply_changes(self, changed_paths):
+        with self.lock:
+            if self.template_path in changed_paths or any(path in changed_paths for path in self.template_includes()):
+                self.pages.clear()
+            markdown_paths = {path for path in changed_paths if path.endswith(".md")}
+            if any(path not in self.sources.values() or not os.path.exists(path) for path in markdown_paths):
+                self.sources = self.collect_pages()
+                self.pages = {key: page for key, page in self.pages.items() if key in self.sources}
+            for key, source in self.sources.items():
+                if source in markdown_paths and key in self.pages:
+                    try:
+                        self.pages[key] = inject_live_reload(self.render_page(source)).encode("utf-8")
+                    except Exception:
+                        # rendered on the next request, which reports the error
+                        del self.pages[key]
+            for path in changed_paths:
+                self.assets.pop(os.path.realpath(path), None)
+            self.generation += 1
+            self.changed.notify_all()
+
+    def template_includes(self):
+        try:
+            return load_template(self.template_path).includes
+        except (OSError, ValueError):
+            return []
+
+    def wait_for_change(self, generation, timeout):
+        with self.lock:
+            self.changed.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    head_only = False
+
+    def do_HEAD(self):
+        self.head_only = True
+        self.do_GET()
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path)
+        if path == LIVE_RELOAD_PATH:
+            self.stream_reloads()
+            return
+        try:
+            result = self.server.site.get(path)
+        except Exception:
+            self.send_body(500, "text/plain; charset=utf-8", traceback.format_exc().encode("utf-8"))
+            return
+        if result is None:
+            self.send_body(404, "text/plain; charset=utf-8", b"Not found")
+            return
+        content_type, body = result
+        self.send_body(200, content_type, body)
+
+    def send_body(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if not self.head_only:
+            self.wfile.write(body)
+
+    # server-sent events: one "reload" message per applied change, comments as keep-alives
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        site = self.server.site
+        generation = site.generation
+        while True:
+            latest = site.wait_for_change(generation, timeout=15)
+            message = b": ping\n\n" if latest == generation else b"data: reload\n\n"
+            generation = latest
+            try:
+                self.wfile.write(message)
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site):
+        super().__init__(address, DevRequestHandler)
+        self.site = site
+
+
+def watch(site, paths, interval=0.05, stop=None):
+    watcher = FileWatcher(paths)
+    while stop is None or not stop.is_set():
+        changed = watcher.poll()
+        if changed:
+            started = time.perf_counter()
+            site.apply_changes(changed)
+            logger.info("Rebuilt after %d change(s) in %.1f ms", len(changed), (time.perf_counter() - started) * 1000)
+        time.sleep(interval)
+
+def serve(site, watch_paths, host="localhost", port=8888, interval=0.05):
+    server = DevServer((host, port), site)
+    threading.Thread(target=watch, args=(site, watch_paths, interval), daemon=True).start()
+    logger.info("Serving on http://%s:%d/ (watching %s)", host, server.server_address[1], ", ".join(watch_paths))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
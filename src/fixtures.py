@@ -0,0 +1,23 @@
+import os
+import tempfile
+import unittest
+
+
+# a test case with a temporary directory, self.tmp, removed after each test
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    # path is absolute or relative to the temporary directory; missing parent directories
+    # are created, data may be text or bytes, and the full path is returned
+    def write(self, path, data):
+        path = os.path.join(self.tmp.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(path, "wb") as file:
+                file.write(data)
+        else:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(data)
+        return path
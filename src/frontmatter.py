@@ -0,0 +1,155 @@
+import os
+import re
+
+from htmlnode import MarkdownError
+
+YAML_FENCE = "---"
+TOML_FENCE = "+++"
+YAML_KEY_PATTERN = re.compile(r"^([\w-]+)\s*:\s*(.*)$")
+TOML_KEY_PATTERN = re.compile(r"^([\w-]+)\s*=\s*(.*)$")
+INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+
+
+def parse_scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+    if INTEGER_PATTERN.match(text):
+        return int(text)
+    return text
+
+# a [a, "b", 3] array; items are split on commas outside quotes
+def parse_inline_list(text):
+    inner = text.strip()[1:-1]
+    items = []
+    current = ""
+    quote = None
+    for char in inner:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == ",":
+            items.append(current)
+            current = ""
+            continue
+        current += char
+    if current.strip():
+        items.append(current)
+    return [parse_scalar(item) for item in items]
+
+def parse_value(text, line):
+    text = text.strip()
+    if text.startswith("["):
+        if not text.endswith("]"):
+            raise MarkdownError("front matter list not closed", line)
+        return parse_inline_list(text)
+    return parse_scalar(text)
+
+# the YAML subset pages use: "key: value" scalars, [inline, lists] and block lists
+# of "- item" lines under an empty "key:"
+def parse_yaml_lite(lines, first_line=2):
+    metadata = {}
+    list_key = None
+    for number, line in enumerate(lines, first_line):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if list_key is not None and stripped.startswith("- "):
+            metadata[list_key].append(parse_scalar(stripped[2:]))
+            continue
+        match = YAML_KEY_PATTERN.match(stripped)
+        if match is None:
+            raise MarkdownError(f"invalid front matter line {stripped!r}", number)
+        key, value = match.groups()
+        if value.strip():
+            metadata[key] = parse_value(value, number)
+            list_key = None
+        else:
+            metadata[key] = []
+            list_key = key
+    return metadata
+
+# the TOML subset pages use: key = value with quoted strings, integers, booleans and arrays
+def parse_toml_lite(lines, first_line=2):
+    metadata = {}
+    for number, line in enumerate(lines, first_line):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        match = TOML_KEY_PATTERN.match(stripped)
+        if match is None:
+            raise MarkdownError(f"invalid front matter line {stripped!r}", number)
+        metadata[match.group(1)] = parse_value(match.group(2), number)
+    return metadata
+
+PARSERS = {YAML_FENCE: parse_yaml_lite, TOML_FENCE: parse_toml_lite}
+
+# reads front matter off the start of a file opened in text mode, with readline() so
+# the file can still tell() and seek(); returns (metadata, number of lines consumed)
+# and leaves the file at the first body line, or at the start when there is none
+def read_front_matter(file):
+    start = file.tell()
+    fence = file.readline().rstrip()
+    if fence not in PARSERS:
+        file.seek(start)
+        return {}, 0
+    lines = []
+    while True:
+        line = file.readline()
+        if not line:
+            raise MarkdownError("front matter not closed", 1)
+        if line.rstrip() == fence:
+            break
+        lines.append(line)
+    return PARSERS[fence](lines), len(lines) + 2
+
+# the same for markdown already in memory; returns (metadata, body, first body line)
+def split_front_matter(markdown):
+    fence, newline, rest = markdown.partition("\n")
+    fence = fence.rstrip()
+    if fence not in PARSERS or not newline:
+        return {}, markdown, 1
+    lines = rest.split("\n")
+    for index, line in enumerate(lines):
+        if line.rstrip() == fence:
+            return PARSERS[fence](lines[:index]), "\n".join(lines[index + 1:]), index + 3
+    raise MarkdownError("front matter not closed", 1)
+
+# front matter values as template variables: lists are joined with commas
+def template_variables(metadata):
+    variables = {}
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        variables[key] = str(value)
+    return variables
+
+# metadata-only scan: the front matter and, without a title in it, the lines up to the
+# first heading are read; the rest of the body is never read or parsed
+def scan_metadata(path):
+    with open(path, encoding="utf-8") as file:
+        metadata, _ = read_front_matter(file)
+        if "title" not in metadata:
+            for line in file:
+                if line.startswith("# "):
+                    metadata["title"] = line[2:].strip()
+                    break
+    return metadata
+
+def scan_pages(content_dir):
+    pages = {}
+    directories = [content_dir]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    directories.append(entry.path)
+                elif entry.name.lower().endswith(".md"):
+                    pages[entry.path] = scan_metadata(entry.path)
+    return pages
@@ -0,0 +1,156 @@
+import re
+
+from blockcache import BlockCache, block_key
+
+# part of every cache key, so entries written by an older set of rules are never reused
+HIGHLIGHT_VERSION = 1
+HIGHLIGHT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+COMMENT_HASH = r"#[^\n]*"
+COMMENT_SLASH = r"//[^\n]*|/\*[\s\S]*?\*/"
+STRING_DOUBLE = r'"(?:[^"\\\n]|\\.)*"'
+STRING_SINGLE = r"'(?:[^'\\\n]|\\.)*'"
+NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+
+LANGUAGE_NAME_UNSAFE = re.compile(r"[^\w+#.-]")
+
+# token rules per language, tried in order at each position; each rule is
+# (css class suffix, pattern) and the text between matches is left plain
+LANGUAGE_RULES = {
+    "python": [
+        ("comment", COMMENT_HASH),
+        ("string", r"[rRbBuUfF]{0,2}(?:'''[\s\S]*?'''|\"\"\"[\s\S]*?\"\"\")"),
+        ("string", r"[rRbBuUfF]{0,2}(?:" + STRING_DOUBLE + "|" + STRING_SINGLE + ")"),
+        ("number", NUMBER),
+    ],
+    "javascript": [
+        ("comment", COMMENT_SLASH),
+        ("string", STRING_DOUBLE + "|" + STRING_SINGLE + r"|`(?:[^`\\]|\\.)*`"),
+        ("number", NUMBER),
+    ],
+    "go": [
+        ("comment", COMMENT_SLASH),
+        ("string", STRING_DOUBLE + "|" + STRING_SINGLE + r"|`[^`]*`"),
+        ("number", NUMBER),
+    ],
+    "shell": [
+        ("comment", r"(?<![\w$])#[^\n]*"),
+        ("string", STRING_DOUBLE + r"|'[^']*'"),
+        ("variable", r"\$(?:\{[^}\n]*\}|\w+|[@*#?$!])"),
+    ],
+    "json": [
+        ("string", STRING_DOUBLE),
+        ("number", r"-?" + NUMBER),
+    ],
+    "css": [
+        ("comment", r"/\*[\s\S]*?\*/"),
+        ("string", STRING_DOUBLE + "|" + STRING_SINGLE),
+        ("keyword", r"@[\w-]+|!important\b"),
+        ("number", r"#[0-9a-fA-F]{3,8}\b|-?\b\d+(?:\.\d+)?(?:%|[a-z]+\b)?"),
+    ],
+}
+
+# identifiers are matched whole and looked up here, which is much cheaper than trying
+# an alternation of every keyword at every position
+LANGUAGE_WORDS = {
+    "python": {
+        "keyword": "and as assert async await break class continue def del elif else except finally for from global if import in is lambda nonlocal not or pass raise return try while with yield",
+        "literal": "True False None",
+    },
+    "javascript": {
+        "keyword": "async await break case catch class const continue default delete do else export extends finally for function if import in instanceof let new of return static switch this throw try typeof var void while yield",
+        "literal": "true false null undefined NaN",
+    },
+    "go": {
+        "keyword": "break case chan const continue default defer else fallthrough for func go goto if import interface map package range return select struct switch type var",
+        "literal": "true false nil iota",
+    },
+    "shell": {
+        "keyword": "if then else elif fi for while until do done case esac function in return export local",
+    },
+    "json": {
+        "literal": "true false null",
+    },
+    "css": {},
+}
+
+LANGUAGE_ALIASES = {
+    "py": "python", "python3": "python",
+    "js": "javascript", "mjs": "javascript", "ts": "javascript", "typescript": "javascript",
+    "golang": "go",
+    "sh": "shell", "bash": "shell", "zsh": "shell", "console": "shell",
+}
+
+# every language's rules compiled into one alternation of numbered groups, the last one
+# matching identifiers, so a snippet is tokenized in a single left-to-right scan
+def compile_rules(rules, words):
+    pattern = re.compile("|".join(f"({rule})" for _, rule in rules) + r"|([A-Za-z_]\w*)")
+    word_classes = {word: name for name, names in words.items() for word in names.split()}
+    return pattern, [name for name, _ in rules], word_classes
+
+# languages are compiled the first time a snippet uses them, not on import
+_compiled_languages = {}
+
+def compiled_language(language):
+    compiled = _compiled_languages.get(language)
+    if compiled is None:
+        compiled = _compiled_languages[language] = compile_rules(LANGUAGE_RULES[language], LANGUAGE_WORDS[language])
+    return compiled
+
+# the first word of a fence's info string, lowercased; it ends up in a class attribute,
+# so anything but word characters and + # . - is dropped
+def language_name(info):
+    language = LANGUAGE_NAME_UNSAFE.sub("", info.split()[0].lower()) if info.strip() else ""
+    return LANGUAGE_ALIASES.get(language, language)
+
+def escape_code(text):
+    # quotes are left alone: code is element text, never an attribute value
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+# escaped html for a snippet, with tokens wrapped in <span class="hl-...">; code in a
+# language without rules is only escaped
+def highlight(code, language):
+    if language not in LANGUAGE_RULES:
+        return escape_code(code)
+    pattern, names, word_classes = compiled_language(language)
+    word_group = len(names) + 1
+    parts = []
+    position = 0
+    for match in pattern.finditer(code):
+        if match.lastindex == word_group:
+            name = word_classes.get(match.group())
+            if name is None:
+                continue
+        elif match.start() == match.end():
+            continue
+        else:
+            name = names[match.lastindex - 1]
+        parts.append(escape_code(code[position:match.start()]))
+        parts.append(f'<span class="hl-{name}">{escape_code(match.group())}</span>')
+        position = match.end()
+    parts.append(escape_code(code[position:]))
+    return "".join(parts)
+
+
+# set per process by use_highlight_cache; highlighted snippets keyed by language and a
+# hash of the code, kept on disk between builds so repeated snippets are highlighted once
+highlight_cache = None
+
+def use_highlight_cache(path=None, max_bytes=HIGHLIGHT_CACHE_MAX_BYTES):
+    global highlight_cache
+    highlight_cache = BlockCache(max_bytes)
+    if path is not None:
+        highlight_cache.load(path)
+    return highlight_cache
+
+def highlight_code(code, language):
+    if language not in LANGUAGE_RULES:
+        return escape_code(code)
+    if highlight_cache is None:
+        return highlight(code, language)
+    key = block_key(code, f"{language}@{HIGHLIGHT_VERSION}")
+    highlighted = highlight_cache.get(key)
+    if highlighted is None:
+        highlighted = highlight(code, language)
+        highlight_cache.put(key, highlighted)
+    return highlighted
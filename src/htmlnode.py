@@ -1,44 +1,98 @@
+import io
 import re
 from textnode import *
+from blockcache import block_key
+from highlight import highlight_code, language_name
+
+# props are stored as a tuple of (name, value) pairs; nodes without props share this one
+EMPTY_PROPS = ()
+
+# most text has nothing to escape, so a few substring checks decide whether the
+# replace chain runs at all
+def escape_text(text):
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def escape_attribute(value):
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def escape_quotes(value):
+    return value.replace('"', "&quot;") if '"' in value else value
+
+def freeze_props(props):
+    if not props:
+        return EMPTY_PROPS
+    if isinstance(props, dict):
+        return tuple(props.items())
+    return tuple(props)
 
 class HTMLNode:
-    def __init__(self, tag=None, value=None, children=None, props=None):
+    # escaped holds the value as written to html: the value itself for safe nodes, whose
+    # value is already html and whose prop values only need their quotes escaped, and for
+    # other nodes the escaped value once it has been computed; one slot serves both
+    __slots__ = ("tag", "value", "children", "props", "escaped")
+
+    def __init__(self, tag=None, value=None, children=None, props=None, safe=False):
         self.tag = tag
         self.value = value
         self.children = children
-        self.props = props
+        self.props = freeze_props(props)
+        self.escaped = value if safe else None
+
+    @property
+    def safe(self):
+        return self.escaped is not None and self.escaped is self.value
 
     def to_html(self):
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self):
-        if self.props is None:
+        if not self.props:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
-        return props_html
+        escape = escape_quotes if self.safe else escape_attribute
+        # values such as width=100 need not be strings
+        return "".join(f' {prop}="{escape(str(value))}"' for prop, value in self.props)
+
+    def iter_html(self):
+        return iter_html(self)
+
+    def write_html(self, file):
+        write_html(self, file)
 
     def __repr__(self):
         return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
 
 
 class LeafNode(HTMLNode):
-    def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
+    __slots__ = ()
 
+    def __init__(self, tag, value, props=None, safe=False):
+        super().__init__(tag, value, None, props, safe)
+
+    # the value is escaped the first time the node is serialized and reused after that;
+    # the substring checks are inlined since most text has nothing to escape
     def to_html(self):
-        if self.value is None:
+        value = self.value
+        if value is None:
             raise ValueError("Invalid HTML: no value")
+        if self.escaped is not None:
+            value = self.escaped
+        elif "&" in value or "<" in value or ">" in value:
+            value = self.escaped = escape_text(value)
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return value
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
@@ -47,30 +101,66 @@ class ParentNode(HTMLNode):
             raise ValueError("No tag")
         if self.children is None:
             raise ValueError("Invalid HTML: no children")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return "".join(iter_html(self))
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
-        
-def text_node_to_html_node(textnode):
-    match textnode.text_type:
-        case TextType.TEXT:
-            return LeafNode(tag=None, value=textnode.text, props=None)
-        case TextType.BOLD:
-            return LeafNode(tag="b", value=textnode.text, props=None)
-        case TextType.ITALIC:
-            return LeafNode(tag="i", value=textnode.text, props=None)
-        case TextType.CODE:
-            return LeafNode(tag="code", value=textnode.text, props=None)
-        case TextType.LINK:
-            return LeafNode(tag="a", value=textnode.text, props={"href": textnode.url})
-        case TextType.IMAGE:
-            return LeafNode(tag="img", value="", props={"src": textnode.url, "alt": textnode.text})
-
-    raise Exception("Invalid type")
+
+# walks the tree with an explicit stack instead of recursing, so deep trees cannot
+# hit the recursion limit; closing tags are pushed as plain strings
+def iter_html(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            yield node
+        elif isinstance(node, ParentNode):
+            if node.tag is None:
+                raise ValueError("No tag")
+            if node.children is None:
+                raise ValueError("Invalid HTML: no children")
+            yield f"<{node.tag}{node.props_to_html()}>"
+            stack.append(f"</{node.tag}>")
+            stack.extend(reversed(node.children))
+        else:
+            yield node.to_html()
+
+def write_html(node, file, buffer_size=65536):
+    buffer = []
+    buffered = 0
+    for chunk in iter_html(node):
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            file.write("".join(buffer))
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        file.write("".join(buffer))
+
+TEXT_NODE_BUILDERS = {
+    TextType.TEXT: lambda textnode, safe: LeafNode(None, textnode.text, safe=safe),
+    TextType.BOLD: lambda textnode, safe: LeafNode("b", textnode.text, safe=safe),
+    TextType.ITALIC: lambda textnode, safe: LeafNode("i", textnode.text, safe=safe),
+    TextType.CODE: lambda textnode, safe: LeafNode("code", textnode.text, safe=safe),
+    TextType.LINK: lambda textnode, safe: LeafNode("a", textnode.text, (("href", textnode.url),), safe),
+    TextType.IMAGE: lambda textnode, safe: LeafNode("img", "", (("src", textnode.url), ("alt", textnode.text)), safe),
+}
+
+NESTED_TEXT_TAGS = {
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+}
+
+# safe: the text node's text and url were escaped already (see t2c)
+def text_node_to_html_node(textnode, safe=False):
+    if textnode.children is not None and textnode.text_type in NESTED_TEXT_TAGS:
+        children = [text_node_to_html_node(child, safe) for child in textnode.children]
+        return ParentNode(NESTED_TEXT_TAGS[textnode.text_type], children)
+    builder = TEXT_NODE_BUILDERS.get(textnode.text_type)
+    if builder is None:
+        raise Exception("Invalid type")
+    return builder(textnode, safe)
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
@@ -94,115 +184,228 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         new_nodes.extend(split_nodes)
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+INLINE_SPECIAL = re.compile(r"[`*!\[]")
+ORDERED_NUMBER_PATTERN = re.compile(r"^(\d+)")
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches   
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
-def split_nodes_image(old_nodes):
+def split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
         original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
+        position = 0
+        for match in pattern.finditer(original_text):
+            if match.start() > position:
+                new_nodes.append(TextNode(original_text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+        if position == 0:
             new_nodes.append(old_node)
-            continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(
-                TextNode(
-                    image[0],
-                    TextType.IMAGE,
-                    image[1],
-                )
-            )
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
+        elif position < len(original_text):
+            new_nodes.append(TextNode(original_text[position:], TextType.TEXT))
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+def emphasis_node(children, text_type):
+    if len(children) == 1 and children[0].text_type == TextType.TEXT:
+        return TextNode(children[0].text, text_type)
+    return TextNode("".join(child.text for child in children), text_type, children=children)
+
+# one left-to-right scan: plain text is sliced between special characters, code spans,
+# images and links are matched in place, and emphasis recurses until its closing
+# delimiter, which is what lets bold and italic nest; outer is the delimiter of the
+# emphasis enclosing this one
+def tokenize_inline(text, position=0, closer=None, outer=None):
+    nodes = []
+    plain_start = position
+    while True:
+        match = INLINE_SPECIAL.search(text, position)
+        if match is None:
+            break
+        start = match.start()
+        char = text[start]
+        if char == "`":
+            end = text.find("`", start + 1)
+            if end == -1:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            if start > plain_start:
+                nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+            if end > start + 1:
+                nodes.append(TextNode(text[start + 1:end], TextType.CODE))
+            position = plain_start = end + 1
             continue
-        original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
-            new_nodes.append(old_node)
+        if char == "!" or char == "[":
+            pattern, text_type = (IMAGE_PATTERN, TextType.IMAGE) if char == "!" else (LINK_PATTERN, TextType.LINK)
+            link = pattern.match(text, start)
+            if link is None:
+                position = start + 1
+                continue
+            if start > plain_start:
+                nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+            nodes.append(TextNode(link.group(1), text_type, link.group(2)))
+            position = plain_start = link.end()
             continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
-    return new_nodes
+        delimiter = "**" if text.startswith("**", start) else "*"
+        if delimiter == "**" and closer == "*" and text.find("**", start + 2) == -1:
+            if outer == "**" and text.find("**", start + 1) == -1:
+                # these are the last two stars and they close the enclosing bold
+                raise ValueError("Invalid markdown, formatted section not closed")
+            delimiter = "*"
+        if delimiter == closer:
+            if start > plain_start:
+                nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+            return nodes, start + len(delimiter)
+        try:
+            children, end = tokenize_inline(text, start + len(delimiter), delimiter, closer)
+        except ValueError:
+            # inside bold, a * that is not closed before the bold is, as in **a*b**,
+            # is a literal *
+            if delimiter != "*" or closer != "**":
+                raise
+            position = start + 1
+            continue
+        if start > plain_start:
+            nodes.append(TextNode(text[plain_start:start], TextType.TEXT))
+        position = end
+        if children:
+            nodes.append(emphasis_node(children, TextType.BOLD if delimiter == "**" else TextType.ITALIC))
+        plain_start = position
+    if closer is not None:
+        raise ValueError("Invalid markdown, formatted section not closed")
+    if len(text) > plain_start:
+        nodes.append(TextNode(text[plain_start:], TextType.TEXT))
+    return nodes, len(text)
 
 def text_to_textnodes(text):
-    start_node = TextNode(text, TextType.TEXT)
-    output_nodes = [start_node]
-    output_nodes = split_nodes_delimiter(output_nodes, "**", TextType.BOLD)
-    output_nodes = split_nodes_delimiter(output_nodes, "*", TextType.ITALIC)
-    output_nodes = split_nodes_delimiter(output_nodes, "`", TextType.CODE)
-    output_nodes = split_nodes_image(output_nodes)
-    output_nodes = split_nodes_link(output_nodes)
-
-    return output_nodes
+    return tokenize_inline(text)[0]
         
+# args keeps message and line apart so the error pickles, and survives the trip back
+# from a worker process
+class MarkdownError(ValueError):
+    def __init__(self, message, line):
+        super().__init__(message, line)
+        self.message = message
+        self.line = line
+
+    def __str__(self):
+        return f"line {self.line}: {self.message}"
+
+CODE_FENCE = "```"
+
+# scans lines one at a time from a string or any iterable of lines (such as an open
+# file) and yields (first line number, block text) as soon as each block ends; blank
+# lines inside ``` fences belong to the code block instead of ending it; first_line is
+# the number of the first line read, for sources that start after front matter
+def iter_blocks(source, first_line=1):
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    lines = []
+    start = 0
+    in_fence = False
+    for number, line in enumerate(source, first_line):
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if stripped.startswith(CODE_FENCE):
+            # a fence that opens and closes on one line leaves the state unchanged
+            if in_fence or len(stripped) < 2 * len(CODE_FENCE) or not stripped.endswith(CODE_FENCE):
+                in_fence = not in_fence
+        elif not stripped and not in_fence:
+            if lines:
+                yield start, "\n".join(lines).strip()
+                lines = []
+            continue
+        if not lines:
+            start = number
+        lines.append(line)
+    if lines:
+        yield start, "\n".join(lines).strip()
+
 def markdown_to_blocks(text):
-    output = re.sub(r'\n{3,}', '\n\n', text)
-    output = output.split("\n\n")
-    new_output = []
-    for index, put in enumerate(output):
-        if put == "":
-            output.pop(index)
-        else:
-            new_output.append(put.lstrip().rstrip())
+    return [block for _, block in iter_blocks(text)]
+
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+# recognizers for the built-in block types; each one only sees blocks whose first
+# character it was registered for
+def is_heading(text):
+    return text.startswith(HEADING_PREFIXES)
+
+def is_code(text):
+    return text.startswith(CODE_FENCE) and text.endswith(CODE_FENCE)
+
+def is_quote(text):
+    return all(line.startswith(">") for line in text.split("\n"))
+
+def is_unordered_list(text):
+    marker = text[:2]
+    return marker in ("* ", "- ") and all(line.startswith(marker) for line in text.split("\n"))
+
+def is_ordered_list(text):
+    return all(line.startswith(f"{number}. ") for number, line in enumerate(text.split("\n"), 1))
+
 
-    return new_output
+class BlockType:
+    __slots__ = ("name", "build", "recognize", "first_chars")
+
+    def __init__(self, name, build, recognize=None, first_chars=None):
+        self.name = name
+        self.build = build
+        self.recognize = recognize
+        self.first_chars = first_chars
+
+    def __repr__(self):
+        return f"BlockType({self.name!r}, first_chars={self.first_chars!r})"
+
+
+# name -> BlockType; a block goes to the first recognizer, among those registered for
+# its first character, that accepts it, and is a paragraph when none does
+BLOCK_TYPES = {}
+# first character -> candidate BlockTypes, rebuilt on every registration
+BLOCK_DISPATCH = {}
+# candidates for blocks whose first character no block type was registered for
+ANY_FIRST_CHAR = ()
+
+def rebuild_block_dispatch():
+    global ANY_FIRST_CHAR
+    # later registrations come first, so a plugin can take over a built-in's blocks
+    recognized = [block_type for block_type in reversed(BLOCK_TYPES.values()) if block_type.recognize is not None]
+    ANY_FIRST_CHAR = tuple(block_type for block_type in recognized if block_type.first_chars is None)
+    BLOCK_DISPATCH.clear()
+    for char in {char for block_type in recognized for char in block_type.first_chars or ()}:
+        # types without first_chars are tried for every block, after the dispatched ones
+        dispatched = tuple(block_type for block_type in recognized if block_type.first_chars and char in block_type.first_chars)
+        BLOCK_DISPATCH[char] = dispatched + ANY_FIRST_CHAR
+
+# build(text) returns a node or a list of nodes; recognize(text) decides whether a
+# stripped block is of this type, and first_chars limits which blocks it is asked
+# about (None asks about every block, which is slower)
+def register_block_type(name, build, recognize=None, first_chars=None):
+    BLOCK_TYPES.pop(name, None)
+    BLOCK_TYPES[name] = BlockType(name, build, recognize, first_chars)
+    rebuild_block_dispatch()
+
+def unregister_block_type(name):
+    del BLOCK_TYPES[name]
+    rebuild_block_dispatch()
 
 def block_to_block_type(text):
-    if (text.startswith("# ")
-        or text.startswith("## ")
-        or text.startswith("### ")
-        or text.startswith("#### ")
-        or text.startswith("##### ")
-        or text.startswith("###### ")):
-        return "heading"
-    if text.startswith("```") and text.endswith("```"):
-        return "code"
-    if all(line.startswith(">") for line in text.split("\n")):
-        return "quote"
-    if all(line.startswith("* ") for line in text.split("\n")):
-        return "unordered_list"
-    if all(line.startswith("- ") for line in text.split("\n")):
-        return "unordered_list"
-    if text.startswith("1. "):
-        i = 1
-        for line in text.split("\n"):
-            if not line.startswith(f"{i}. "):
-                return "paragraph"
-            i += 1
-        return "ordered_list"
+    for block_type in BLOCK_DISPATCH.get(text[:1], ANY_FIRST_CHAR):
+        if block_type.recognize(text):
+            return block_type.name
     return "paragraph"
 
 def header_node(text):
@@ -246,9 +449,16 @@ def header_node(text):
 #     children = t2c(text)
 #     return ParentNode(f"h{level}", children)
 
+# the info string after the opening fence names the language; the code itself is not
+# parsed as inline markdown, only escaped and highlighted
 def code_node(text):
-    children = t2c(text[3:-3])
-    child = ParentNode(tag="code",children=children, props=None)
+    info_end = text.find("\n", len(CODE_FENCE))
+    if info_end == -1:
+        language, code = "", text[len(CODE_FENCE):-len(CODE_FENCE)]
+    else:
+        language, code = language_name(text[len(CODE_FENCE):info_end]), text[info_end:-len(CODE_FENCE)]
+    props = (("class", f"language-{language}"),) if language else None
+    child = ParentNode(tag="code", children=[LeafNode(None, highlight_code(code, language), safe=True)], props=props)
     parent = ParentNode(tag="pre", children=(child,))
     return parent
 
@@ -277,7 +487,7 @@ def ordered_list_node(text):
     expected_number = 1
     for line in lines:
         stripped_line = line.strip()
-        match = re.match(r'^(\d+)', stripped_line)
+        match = ORDERED_NUMBER_PATTERN.match(stripped_line)
         ct = len(match.group(1))
         if stripped_line and bool(match) and stripped_line[ct:ct+2] == '. ':
             line_number = int(match.group(1))
@@ -295,97 +505,87 @@ def paragraph_node(text):
     return ParentNode("p", children)
 
 
-def text_to_children(text, block_type):
-
-    if block_type=="heading":
-        return header_node(text)
-
-    if block_type=="code":
-        return code_node(text)
-    
-    if block_type=="quote":
-        return quote_node(text)
-    
-    if block_type=="unordered_list":
-        return unordered_list_node(text)
-    
-    if block_type=="ordered_list":
-        return ordered_list_node(text)
-    
-    if block_type=="paragraph":
-        return paragraph_node(text)
-    
+register_block_type("paragraph", paragraph_node)
+register_block_type("heading", header_node, is_heading, "#")
+register_block_type("code", code_node, is_code, "`")
+register_block_type("quote", quote_node, is_quote, ">")
+register_block_type("unordered_list", unordered_list_node, is_unordered_list, "*-")
+register_block_type("ordered_list", ordered_list_node, is_ordered_list, "1")
 
+def text_to_children(text, block_type):
+    return BLOCK_TYPES[block_type].build(text)
 
+# the whole block is escaped in one pass before it is parsed: & < > are not inline
+# markers and escaping adds none, so the parse is unchanged and every leaf can be
+# built safe instead of being checked one by one when it is serialized
 def t2c(text):
-    text_nodes = text_to_textnodes(text)
+    text_nodes = text_to_textnodes(escape_text(text))
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, safe=True)
         children.append(html_node)
     return children
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+# parse failures are reported with the line the block starts on
+def block_to_nodes(line, block, block_type):
+    try:
+        nodes = text_to_children(block, block_type)
+    except MarkdownError:
+        raise
+    except Exception as e:
+        raise MarkdownError(str(e), line) from e
+    if not isinstance(nodes, list):
+        nodes = [nodes]
+    return nodes
+
+# a block's nodes as one html fragment; a function of its own so profiled builds time
+# it as to_html even when it runs while the page is being parsed
+def nodes_to_html(nodes):
+    return "".join(node.to_html() for node in nodes)
+
+# with a BlockCache, blocks seen before are added as their cached html fragment
+# instead of being parsed again, and new blocks as the fragment they were cached as
+# on_block(block, block_type) sees every block, cached or not, as the page is built
+def markdown_to_html_node(markdown, cache=None, first_line=1, on_block=None):
     parent = ParentNode(tag="div", children=[], props=None)
 
-    for block in blocks:
+    for line, block in iter_blocks(markdown, first_line):
         block_type = block_to_block_type(block)
-        if isinstance(text_to_children(block, block_type),list):
-            parent.children.extend(text_to_children(block, block_type))
-        else:
-            parent.children.append(text_to_children(block, block_type))
-        # print(block)
-        # print(block_type)
-        # print(text_to_children(block, block_type))
-        # print(header_node(block))
-  
-    return parent
-        
-
-
-
-def main():
-    text1 = HTMLNode(tag="p", value=None, children=None, props={"href": "http://www.google.com", "target": "_blank"})
-    # print(text1.props_to_html())
-
-    leaf1 = LeafNode("a", "Click me!", {"href": "https://www.google.com"})
-    # print(leaf1.to_html())
-
-    parent1 = ParentNode("a", [LeafNode("p", "Click me!"), LeafNode("p", "Don't do it!")], {"href": "https://www.amazon.com"})
-    # print(parent1.to_html())
-
-    text2 = TextNode("What is this?", TextType.BOLD, "https://www.boot.dev")
-    # print(text_node_to_html_node(text2).to_html())
-
-    node2 = TextNode("This is **text** with a `code block` word", TextType.TEXT)
-    new_nodes = split_nodes_delimiter([node2], "**", TextType.BOLD)
-    # print(new_nodes)
-
-    text100 = "some bullshit links ![Adios jose](https://www.boot.dev)"
-    # print(extract_markdown_images(text100))
-    text10 = "This is text with a link [to boot dev](https://www.boot.dev) and [to youtube](https://www.youtube.com/@bootdotdev)"
-    # print(extract_markdown_images(text100)[0][1])
-
-    text5 = TextNode("This is text with an image ![alt text](https://www.boots.dev/image.png) actually two images ![another one](https://www.google.com/logo.img) and that's it.", TextType.TEXT,)
-    text6 = TextNode("This is text with a link in it [link 1](http://www.google.com)", TextType.TEXT)
-    text7 = "This is **text** with an *italic* word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
-    text8 = "     This is a test\n\n\n\n block 2\n\n block 3\n  block 3a  \nblock3b"
-    text9 = "# head1 \n ## **head2** oof\n ### head3"
-    # print(split_nodes_link([text6]))
-    # split_nodes_image([text5])
-    # print(text_to_textnodes(text7))
-    # text9 = "####### header 3"
-    # print(markdown_to_blocks(text9))
-    # text_to_textnodes(text7)
-    # print(block_to_block_type(text9))
-    # print(markdown_to_html_node(text9))
-    # print(t2c(text9))
-    # print(block_to_block_type(text9))
-    # t2c(text7)
-    # print(header_node(text9))
-
-main()
-
+        if on_block is not None:
+            on_block(block, block_type)
+        if cache is not None:
+            key = block_key(block, block_type)
+            html = cache.get(key)
+            if html is not None:
+                parent.children.append(LeafNode(None, html, safe=True))
+                continue
+        nodes = block_to_nodes(line, block, block_type)
+        if cache is None:
+            parent.children.extend(nodes)
+            continue
+        # serialized once: the fragment is both cached and added in place of the nodes
+        html = nodes_to_html(nodes)
+        cache.put(key, html)
+        parent.children.append(LeafNode(None, html, safe=True))
 
+    return parent
 
+# the same html as markdown_to_html_node(markdown).to_html(), produced one block at a
+# time; reading from a file, only the current block and its nodes are held in memory
+def iter_markdown_html(markdown, cache=None, first_line=1, on_block=None):
+    yield "<div>"
+    for line, block in iter_blocks(markdown, first_line):
+        block_type = block_to_block_type(block)
+        if on_block is not None:
+            on_block(block, block_type)
+        if cache is not None:
+            key = block_key(block, block_type)
+            html = cache.get(key)
+            if html is not None:
+                yield html
+                continue
+        html = nodes_to_html(block_to_nodes(line, block, block_type))
+        if cache is not None:
+            cache.put(key, html)
+        yield html
+    yield "</div>"
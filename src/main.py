@@ -1,8 +1,55 @@
+import json
+import logging
 import os
 import shutil
+import sys
 
 from htmlnode import *
 from textnode import *
+from manifest import BuildManifest, hash_bytes, hash_file
+from template import load_template
+from blockcache import BlockCache
+import highlight
+from depgraph import DependencyGraph, block_references, page_url, url_key
+from siteindex import PageMetadata, SiteIndex
+from frontmatter import read_front_matter, split_front_matter, template_variables
+from bulkio import BulkIO, atomic_open, copy_atomic, read_text, write_atomic
+import profiler
+
+# argparse, the process pool and the servers are imported where they are used,
+# so importing this module stays cheap for tests and tooling
+
+BUILD_DIR = ".build"
+MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+BLOCK_CACHE_PATH = os.path.join(BUILD_DIR, "blocks.json")
+TRACE_PATH = os.path.join(BUILD_DIR, "trace.json")
+GRAPH_PATH = os.path.join(BUILD_DIR, "depgraph.json")
+SITE_INDEX_PATH = os.path.join(BUILD_DIR, "siteindex.json")
+HIGHLIGHT_CACHE_PATH = os.path.join(BUILD_DIR, "highlight.json")
+COMMANDS = ("build", "clean", "serve", "host")
+
+logger = logging.getLogger(__name__)
+
+# a root logger that already has handlers, such as one set up by a test or by code
+# calling main(), keeps them; only the level follows --log-level and -q
+def configure_logging(level):
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(format="%(message)s")
+    root.setLevel(level)
+
+# set per process by use_block_cache; worker processes get their own copy
+block_cache = None
+
+def use_block_cache(max_bytes, path=None):
+    global block_cache
+    if max_bytes <= 0:
+        block_cache = None
+        return None
+    block_cache = BlockCache(max_bytes)
+    if path is not None:
+        block_cache.load(path)
+    return block_cache
 
 def remove_contents(directory):
     for item in os.listdir(directory):
@@ -17,87 +64,490 @@ def copy_contents(source_directory, destination_directory):
         source_path = os.path.join(source_directory, item)
         destination_path = os.path.join(destination_directory, item)
         if os.path.isdir(source_path):
-            shutil.copytree(source_path,destination_path)
+            shutil.copytree(source_path,destination_path, dirs_exist_ok=True)
         else:
             shutil.copy2(source_path, destination_path)
 
+def file_unchanged(source_path, destination_path, checksum=False):
+    try:
+        destination_stat = os.stat(destination_path)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != destination_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == destination_stat.st_mtime_ns:
+        return True
+    return checksum and hash_file(source_path) == hash_file(destination_path)
+
+def remove_empty_parents(path, stop_directory):
+    directory = os.path.dirname(path)
+    stop_directory = os.path.abspath(stop_directory)
+    while os.path.abspath(directory) != stop_directory and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+# rsync-style sync: only new or changed files are copied, and only files a previous
+# sync put there are deleted, so generated pages in the destination stay in place
+# with a BulkIO, the changed files are copied concurrently
+def sync_contents(source_directory, destination_directory, previous_files=(), checksum=False, io=None):
+    synced = set()
+    copies = []
+    removed = 0
+    for root, _, files in os.walk(source_directory):
+        relative_root = os.path.relpath(root, source_directory)
+        destination_root = os.path.normpath(os.path.join(destination_directory, relative_root))
+        os.makedirs(destination_root, exist_ok=True)
+        for name in files:
+            relative_path = os.path.normpath(os.path.join(relative_root, name))
+            synced.add(relative_path)
+            source_path = os.path.join(root, name)
+            destination_path = os.path.join(destination_root, name)
+            if not file_unchanged(source_path, destination_path, checksum):
+                copies.append((source_path, destination_path))
+    if io is not None:
+        io.map(copy_atomic, copies)
+    else:
+        for source_path, destination_path in copies:
+            copy_atomic(source_path, destination_path)
+    for relative_path in previous_files:
+        if relative_path in synced:
+            continue
+        destination_path = os.path.join(destination_directory, relative_path)
+        if os.path.isfile(destination_path) or os.path.islink(destination_path):
+            os.unlink(destination_path)
+            remove_empty_parents(destination_path, destination_directory)
+            removed += 1
+    return sorted(synced), len(copies), removed
 
-def refresh_public_folder(static_folder="static", public_folder="public"):
-    #remove all contents from public folder and replace with contents from static folder
+
+def refresh_public_folder(static_folder="static", public_folder="public", clean=True, manifest=None, checksum=False, io=None):
+    #with clean, remove all contents from public folder before syncing the static folder into it
+    #without clean, previously generated pages are kept so incremental builds can skip them
     if not os.path.exists(public_folder):
         os.mkdir(public_folder)
-    else:
+    elif clean:
         remove_contents(public_folder)
-    copy_contents(static_folder, public_folder)
+    previous_files = manifest.assets if manifest is not None else ()
+    synced, copied, removed = sync_contents(static_folder, public_folder, previous_files, checksum, io)
+    if manifest is not None:
+        manifest.assets = synced
+    logger.info("Synced %s to %s: %d copied, %d removed", static_folder, public_folder, copied, removed)
 
+# markdown may be a string or an iterable of lines such as an open file; either way
+# the search stops at the first "# " heading instead of splitting the whole document
 def extract_title(markdown):
-    markdown_lines = markdown.split("\n")
+    if isinstance(markdown, str):
+        if markdown.startswith("# "):
+            start = 0
+        else:
+            start = markdown.find("\n# ") + 1
+            if start == 0:
+                raise Exception("No header found")
+        end = markdown.find("\n", start)
+        if end == -1:
+            end = len(markdown)
+        return markdown[start + 2:end].strip()
 
-    for markdown_line in markdown_lines:
+    for markdown_line in markdown:
         if markdown_line.startswith("# "):
             return markdown_line[2:].strip()
     raise Exception("No header found")
 
-refresh_public_folder()
+# what the dependency graph and site index need from a page, gathered from its blocks
+# while it renders, so the source is not read and parsed again once the page is written
+class PageFacts:
+    def __init__(self):
+        self.title = None
+        self.images = []
+        self.links = []
+        self.metadata = PageMetadata()
 
-def generate_page(from_path, template_path, dest_path):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    def add_block(self, block, block_type):
+        block_references(block, block_type, self.images, self.links)
+        self.metadata.add_block(block, block_type)
 
+    # a plain dict, so it can be sent back from a worker process
+    def result(self):
+        return {"images": self.images, "links": self.links, "metadata": self.metadata.result(self.title)}
+
+# variables fill {{ name }} placeholders in the template besides Title and Content
+# facts, a PageFacts, is filled in as the page is parsed
+def page_context(from_path, variables=None, facts=None):
     # import markdown from from_path
-    try:
+    with profiler.stage("read"):
         with open(from_path) as md_contents:
             markdown_contents = md_contents.read()
-    except FileNotFoundError:
-        return "Error: No file found."
-    except Exception as e:
-        return f"An error has occurred: {e}"
-    
-    # import template from template_path
-    try:
-        with open(template_path) as temp_contents:
-            template_contents = temp_contents.read()
-    except FileNotFoundError:
-        return "Error: No file found."
-    except Exception as e:
-        return f"An error has occurred: {e}"
-
-    md_to_html = markdown_to_html_node(markdown_contents).to_html()
-    title = extract_title(markdown_contents)
-    output_html = template_contents.replace("{{ Title }}", title).replace("{{ Content }}", md_to_html)
- 
-    try:
-        with open(dest_path+"/index.html", 'w', encoding='utf-8') as file:
-            file.write(output_html)
-            print(f"Successfully wrote to the file: {dest_path+"/index.html"}")
-    except Exception as e:
-                print(f"An error occurred: {e}")
-    
-# generate_pages_recursively 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
+    return markdown_context(markdown_contents, variables, facts)
+
+# a title in the front matter wins over the first heading
+def page_title(front_matter, markdown):
+    if "title" in front_matter:
+        return str(front_matter["title"])
+    return extract_title(markdown)
+
+# front matter values fill placeholders too, and override --var values of the same name;
+# both are plain text, escaped with quotes included so they can fill attribute values
+# as well as element text, and there is no way to put raw html in a page through them
+def front_matter_context(front_matter, variables=None):
+    context = dict(variables or {})
+    context.update(template_variables(front_matter))
+    return {name: escape_attribute(value) for name, value in context.items()}
+
+def markdown_context(markdown_contents, variables=None, facts=None):
+    front_matter, body, first_line = split_front_matter(markdown_contents)
+    context = front_matter_context(front_matter, variables)
+    title = page_title(front_matter, body)
+    if facts is None:
+        context["Content"] = markdown_to_html_node(body, block_cache, first_line)
+    else:
+        facts.title = title
+        context["Content"] = markdown_to_html_node(body, block_cache, first_line, facts.add_block)
+    context["Title"] = escape_text(title)
+    return context
+
+def render_page(from_path, template_path, variables=None):
+    return load_template(template_path).render(page_context(from_path, variables))
+
+# with collect, the page's PageFacts are returned as a dict
+def generate_page(from_path, template_path, dest_path, variables=None, collect=False):
+    logger.info("Generating page from %s to %s using %s", from_path, dest_path, template_path)
+    facts = PageFacts() if collect else None
+
+    with profiler.page_scope(from_path):
+        # the parsed template is cached across pages
+        template = load_template(template_path)
+
+        os.makedirs(dest_path, exist_ok=True)
+        if profiler.active() is None:
+            # the source is read twice, up to its first heading for the title and then block
+            # by block while each block's html is written, so memory use is bounded by the
+            # largest block rather than the size of the file
+            with open(from_path, encoding="utf-8") as source:
+                front_matter, header_lines = read_front_matter(source)
+                body_start = source.tell()
+                context = front_matter_context(front_matter, variables)
+                title = page_title(front_matter, source)
+                context["Title"] = escape_text(title)
+                source.seek(body_start)
+                if facts is None:
+                    context["Content"] = iter_markdown_html(source, block_cache, header_lines + 1)
+                else:
+                    facts.title = title
+                    context["Content"] = iter_markdown_html(source, block_cache, header_lines + 1, facts.add_block)
+                with atomic_open(dest_path+"/index.html") as file:
+                    template.write(file, context)
+        else:
+            context = page_context(from_path, variables, facts)
+            # profiled builds render in separate steps so each one can be timed on its own
+            with profiler.stage("to_html"):
+                context["Content"] = context["Content"].to_html()
+            with profiler.stage("templating"):
+                output_html = template.render(context)
+            with profiler.stage("write"):
+                write_atomic(dest_path+"/index.html", output_html)
+    logger.debug("Successfully wrote to the file: %s/index.html", dest_path)
+    return facts.result() if collect else None
+
+# first pass: every markdown file under dir_path_content with the directory its page goes to
+def collect_page_jobs(dir_path_content, dest_dir_path):
+    jobs = []
     list_of_files = os.listdir(dir_path_content)
     for item in list_of_files:
         path_to = os.path.join(dir_path_content, item)
         if os.path.isfile(path_to):
             _, ext = os.path.splitext(path_to)
             if ext.lower() == ".md":
-                generate_page(path_to, template_path, dest_dir_path)
+                jobs.append((path_to, dest_dir_path))
         if os.path.isdir(path_to):
-            new_dir_path_content = os.path.join(dir_path_content, item)
-            new_dest_dir_path = os.path.join(dest_dir_path, item)
-            if not os.path.exists(new_dest_dir_path):
-                os.makedirs(new_dest_dir_path)
-                print(f"directory created: {new_dest_dir_path}")
-            generate_pages_recursive(new_dir_path_content, template_path, new_dest_dir_path)
+            jobs.extend(collect_page_jobs(path_to, os.path.join(dest_dir_path, item)))
+    return jobs
+
+def init_worker(cache_max_bytes, cache_path, log_level, profiling):
+    configure_logging(log_level)
+    use_block_cache(cache_max_bytes, cache_path)
+    highlight.use_highlight_cache(HIGHLIGHT_CACHE_PATH)
+    if profiling:
+        profiler.enable()
+
+# runs in a worker process; returns the page's facts, and what the worker's block and
+# highlight caches and profiler recorded for the page so the parent can merge it
+def generate_page_job(from_path, template_path, dest_path, variables=None, persist_blocks=False, collect=False):
+    facts = generate_page(from_path, template_path, dest_path, variables, collect)
+    return {
+        "facts": facts,
+        "blocks": block_cache.drain(include_entries=persist_blocks) if block_cache is not None else None,
+        "highlights": highlight.highlight_cache.drain(include_entries=True) if highlight.highlight_cache is not None else None,
+        "profile": profiler.active().drain() if profiler.active() is not None else None,
+    }
+
+# with a BulkIO, sources are read and pages written on its threads while parsing
+# stays on this one; whole sources are read, so the streaming path is not used
+def render_page_jobs_io(jobs, template_path, io, variables=None, collect=False):
+    facts = {}
+
+    def process(job, markdown):
+        from_path, dest_path = job
+        logger.info("Generating page from %s to %s using %s", from_path, dest_path, template_path)
+        page_facts = PageFacts() if collect else None
+        context = markdown_context(markdown, variables, page_facts)
+        if collect:
+            facts[job] = page_facts.result()
+        return load_template(template_path).render(context)
+
+    def write(job, output_html):
+        _, dest_path = job
+        os.makedirs(dest_path, exist_ok=True)
+        write_atomic(os.path.join(dest_path, "index.html"), output_html)
+
+    errors = io.pipeline(jobs, lambda job: read_text(job[0]), process, write)
+    return [(error, facts.get(job) if error is None else None) for job, error in zip(jobs, errors)]
+
+# persist_blocks: worker block caches start from the cache file, and send their new entries back
+# collect: each rendered page's facts are returned as well (see PageFacts)
+def render_page_jobs(jobs, template_path, workers=1, variables=None, persist_blocks=False, io=None, collect=False):
+    # returns one (error or None, facts or None) pair per job, in job order
+    if workers <= 1 or len(jobs) <= 1:
+        # profiled builds stay serial so every stage is timed on one thread
+        if io is not None and len(jobs) > 1 and profiler.active() is None:
+            return render_page_jobs_io(jobs, template_path, io, variables, collect)
+        results = []
+        for from_path, dest_path in jobs:
+            try:
+                results.append((None, generate_page(from_path, template_path, dest_path, variables, collect)))
+            except Exception as e:
+                results.append((e, None))
+        return results
+    from concurrent.futures import ProcessPoolExecutor
+    initargs = (
+        block_cache.max_bytes if block_cache is not None else 0,
+        BLOCK_CACHE_PATH if persist_blocks else None,
+        logging.getLogger().level,
+        profiler.active() is not None,
+    )
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+        futures = [
+            executor.submit(generate_page_job, from_path, template_path, dest_path, variables, persist_blocks, collect)
+            for from_path, dest_path in jobs
+        ]
+        results = []
+        for future in futures:
+            error = future.exception()
+            facts = None
+            if error is None:
+                result = future.result()
+                facts = result["facts"]
+                if block_cache is not None:
+                    block_cache.merge(result["blocks"])
+                if highlight.highlight_cache is not None and result["highlights"] is not None:
+                    highlight.highlight_cache.merge(result["highlights"])
+                if profiler.active() is not None:
+                    profiler.active().merge(result["profile"])
+            results.append((error, facts))
+        return results
+
+# generate_pages_recursively 
+# with a manifest, pages whose markdown and template hashes are unchanged are skipped
+# with a dependency graph as well, pages are also rebuilt when a static asset or page they
+# reference changes, appears or disappears, and the graph is updated for rebuilt pages
+# with a site index, the metadata of rebuilt pages is collected for the sitemap, feed and search index
+# returns a list of (source path, error) for the pages that failed
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, manifest=None, workers=1, variables=None, persist_blocks=False, io=None, graph=None, static_dir="static", site_index=None):
+    with profiler.stage("walk"):
+        jobs = collect_page_jobs(dir_path_content, dest_dir_path)
+    source_hashes = {}
+    invalidated = set()
+    if manifest is not None and graph is not None:
+        graph.begin_build({url_key(page_url(dest_path, dest_dir_path)): from_path for from_path, dest_path in jobs}, static_dir)
+        invalidated = graph.invalidated()
+    if manifest is not None and site_index is not None:
+        site_index.prune(from_path for from_path, _ in jobs)
+        invalidated.update(from_path for from_path, _ in jobs if from_path not in site_index.pages)
+    if manifest is not None:
+        template_files = [template_path, *load_template(template_path).includes]
+        # a changed partial invalidates the pages of every template including it
+        template_hash = manifest.template_hash(template_path)
+        if len(template_files) > 1:
+            template_hash = hash_bytes("".join(manifest.template_hash(path) for path in template_files).encode())
+        if variables:
+            # changing a template variable invalidates every page just like editing the template
+            template_hash = hash_bytes((template_hash + json.dumps(variables, sort_keys=True)).encode())
+        stale_jobs = []
+        sources = [from_path for from_path, _ in jobs]
+        if io is not None:
+            source_hashes = dict(zip(sources, io.map(hash_file, [(source,) for source in sources])))
+        else:
+            source_hashes = {source: hash_file(source) for source in sources}
+        for from_path, dest_path in jobs:
+            fresh = manifest.is_fresh(from_path, source_hashes[from_path], template_hash, os.path.join(dest_path, "index.html"))
+            if fresh and from_path not in invalidated:
+                logger.debug("Skipping unchanged page %s", from_path)
+            else:
+                stale_jobs.append((from_path, dest_path))
+        jobs = stale_jobs
+
+    failures = []
+    collect = manifest is not None and (graph is not None or site_index is not None)
+    for (from_path, dest_path), (error, facts) in zip(jobs, render_page_jobs(jobs, template_path, workers, variables, persist_blocks, io, collect)):
+        if error is not None:
+            failures.append((from_path, error))
+        elif manifest is not None:
+            manifest.record(from_path, source_hashes[from_path], template_hash, os.path.join(dest_path, "index.html"))
+            url = page_url(dest_path, dest_dir_path)
+            if graph is not None:
+                graph.record(from_path, template_files, facts["images"], facts["links"], url)
+            if site_index is not None:
+                site_index.record(from_path, url, facts["metadata"])
+    return failures
+
+
+def parse_variables(parser, assignments):
+    variables = {}
+    for var in assignments:
+        name, separator, value = var.partition("=")
+        if not separator:
+            parser.error(f"--var expects NAME=VALUE, got {var!r}")
+        variables[name] = value
+    return variables
+
+def run_build(args):
+    from postprocess import postprocess
+
+    if args.profile:
+        profiler.enable()
+    manifest = BuildManifest(MANIFEST_PATH)
+    graph = DependencyGraph(GRAPH_PATH)
+    site_index = SiteIndex(SITE_INDEX_PATH)
+    if not args.full:
+        manifest.load()
+        graph.load()
+        site_index.load()
+    io = BulkIO(args.io_threads) if args.io_threads > 1 else None
+    try:
+        refresh_public_folder(args.static, args.out, clean=args.full, manifest=manifest, checksum=args.checksum, io=io)
+        cache = use_block_cache(args.block_cache_size * 1024 * 1024, BLOCK_CACHE_PATH if args.persist_block_cache else None)
+        highlights = highlight.use_highlight_cache(None if args.full else HIGHLIGHT_CACHE_PATH)
+        failures = generate_pages_recursive(args.content, args.template, args.out, manifest, args.jobs, args.variables, args.persist_block_cache, io, graph, args.static, site_index)
+        site_index.write(args.out, args.site_url)
+        if not args.site_url:
+            logger.warning("No --site-url given: sitemap.xml and feed.xml were not written")
+        with profiler.stage("postprocess"):
+            stats = postprocess(args.out, manifest.assets, args.fingerprint, args.precompress, max(args.jobs, args.io_threads), manifest.compressed)
+        manifest.compressed = stats.pop("siblings")
+        if any(stats.values()):
+            logger.info("Postprocessed %s: %d assets fingerprinted, %d pages rewritten, %d files compressed",
+                        args.out, stats["fingerprinted"], stats["rewritten"], stats["compressed"])
+    finally:
+        if io is not None:
+            io.close()
+    manifest.save(args.out)
+    graph.save()
+    site_index.save()
+    # highlighted snippets are always kept, and the file is only written when one was added
+    if highlights.new_entries:
+        highlights.save(HIGHLIGHT_CACHE_PATH)
+    for page, kind, url in graph.broken_references():
+        logger.warning("Broken %s in %s: %s", kind, page, url)
+    if cache is not None:
+        stats = cache.stats()
+        logger.info("Block cache: %d hits, %d misses (%.0f%%), %d entries, %.0f KiB",
+                    stats["hits"], stats["misses"], stats["hit_rate"] * 100, stats["entries"], stats["size"] / 1024)
+        if args.persist_block_cache:
+            cache.save(BLOCK_CACHE_PATH)
+    if args.profile:
+        profile = profiler.active()
+        profiler.disable()
+        profile.write_trace(args.trace)
+        print(profile.report(args.top))
+        print(f"Trace written to {args.trace}")
+    for from_path, error in failures:
+        logger.error("Failed to generate %s: %s", from_path, error)
+    if failures:
+        sys.exit(f"{len(failures)} page(s) failed to generate")
+
+def run_clean(args):
+    for directory in (args.out, BUILD_DIR):
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+            logger.info("Removed %s", directory)
+
+def run_serve(args):
+    from devserver import DevSite, serve
+
+    use_block_cache(args.block_cache_size * 1024 * 1024)
+    highlight.use_highlight_cache(HIGHLIGHT_CACHE_PATH)
+    site = DevSite(
+        args.static,
+        args.template,
+        lambda source: render_page(source, args.template, args.variables),
+        lambda: {dest: source for source, dest in collect_page_jobs(args.content, "")},
+    )
+    serve(site, [args.content, args.static, args.template, *load_template(args.template).includes], host=args.host, port=args.port)
+
+def run_host(args):
+    from staticserver import serve_static
+
+    serve_static(args.out, host=args.host, port=args.port, threads=args.threads, cache_max_bytes=args.cache_size * 1024 * 1024)
+
+def build_parser():
+    import argparse
 
+    paths = argparse.ArgumentParser(add_help=False)
+    paths.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"), help="logging verbosity (default: INFO)")
+    paths.add_argument("-q", "--quiet", dest="log_level", action="store_const", const="WARNING", help="only log warnings and errors")
+    paths.add_argument("--content", default="content", help="directory of markdown pages (default: content)")
+    paths.add_argument("--static", default="static", help="directory of static assets (default: static)")
+    paths.add_argument("--template", default="template.html", help="page template (default: template.html)")
+    paths.add_argument("--out", default="public", help="output directory (default: public)")
+    variables = argparse.ArgumentParser(add_help=False)
+    variables.add_argument("--var", action="append", default=[], metavar="NAME=VALUE", help="fill {{ NAME }} in the template with VALUE, html-escaped like front matter values; may be repeated")
+    variables.add_argument("--block-cache-size", type=int, default=64, metavar="MB", help="memory for rendered blocks reused across pages; 0 disables the cache (default: 64)")
 
-def main():
-    pass
+    parser = argparse.ArgumentParser(description="Static site generator for content/ and static/.")
+    commands = parser.add_subparsers(dest="command", metavar="{build,clean,serve,host}")
 
-# generate_page("content/index.md", "template.html", "public")
-generate_pages_recursive("content", "/home/jhammett360/workspace/website/template.html", "public")
+    build_command = commands.add_parser("build", parents=[paths, variables], help="generate the site (the default command)")
+    build_command.add_argument("--full", action="store_true", help="rebuild every page instead of only the changed ones")
+    build_command.add_argument("--checksum", action="store_true", help="compare static files by content hash when their mtimes differ")
+    build_command.add_argument("--persist-block-cache", action="store_true", help=f"keep rendered blocks in {BLOCK_CACHE_PATH} between builds")
+    build_command.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="number of pages to render in parallel (default: number of cores)")
+    build_command.add_argument("--site-url", help="absolute url of the site root, such as https://example.com; sitemap.xml and feed.xml are only written when it is given")
+    build_command.add_argument("--fingerprint", action="store_true", help="copy static assets to content-hashed names, point pages at them and write asset-manifest.json")
+    build_command.add_argument("--precompress", action="store_true", help="write .gz (and .br with the brotli package) next to text outputs")
+    build_command.add_argument("--io-threads", type=int, default=1, metavar="N", help="files read, hashed, copied and written concurrently, for slow or network disks; with -j 1 pages are rendered in full rather than streamed (default: 1)")
+    build_command.add_argument("--profile", action="store_true", help="time each build stage per page and print a report")
+    build_command.add_argument("--trace", default=TRACE_PATH, help=f"where --profile writes Chrome trace-event JSON (default: {TRACE_PATH})")
+    build_command.add_argument("--top", type=int, default=10, help="number of slowest pages --profile lists (default: 10)")
+    build_command.set_defaults(handler=run_build)
 
+    clean_command = commands.add_parser("clean", parents=[paths], help="remove the output directory and build state")
+    clean_command.set_defaults(handler=run_clean)
 
+    serve_command = commands.add_parser("serve", parents=[paths, variables], help="serve the site from memory, rebuilding pages as their sources change")
+    serve_command.add_argument("--host", default="localhost", help="address to listen on (default: localhost)")
+    serve_command.add_argument("--port", type=int, default=8888, help="port to listen on (default: 8888)")
+    serve_command.set_defaults(handler=run_serve)
 
+    host_command = commands.add_parser("host", parents=[paths], help="serve the built output directory with caching, conditional requests and precompressed files")
+    host_command.add_argument("--host", default="localhost", help="address to listen on (default: localhost)")
+    host_command.add_argument("--port", type=int, default=8888, help="port to listen on (default: 8888)")
+    host_command.add_argument("--threads", type=int, default=16, help="connections handled at once (default: 16)")
+    host_command.add_argument("--cache-size", type=int, default=64, metavar="MB", help="memory for small files kept between requests (default: 64)")
+    host_command.set_defaults(handler=run_host)
+    return parser
 
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    # a bare invocation or one starting with build options means build
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        argv = ["build", *argv]
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    configure_logging(args.log_level)
+    if hasattr(args, "var"):
+        args.variables = parse_variables(parser, args.var)
+    args.handler(args)
 
-        
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import time
+
+MANIFEST_VERSION = 3
+# every suffix postprocess may write next to an output, brotli or not
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path, chunk_size=65536):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.assets = []
+        # compressed siblings postprocess wrote, so only those are ever removed
+        self.compressed = []
+        self._template_hashes = {}
+        self._seen = set()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        # an old or foreign manifest is treated like a missing one
+        if data.get("version") != MANIFEST_VERSION:
+            return self
+        self.pages = data.get("pages", {})
+        self.assets = data.get("assets", [])
+        self.compressed = data.get("compressed", [])
+        return self
+
+    # pages whose sources were not visited in this build are dropped, and their outputs
+    # removed with any compressed siblings; with public_folder, directories left empty
+    # below it are removed too
+    def save(self, public_folder=None):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self._seen:
+            for source in [source for source in self.pages if source not in self._seen]:
+                self.remove_output(self.pages.pop(source)["output"], public_folder)
+        data = {"version": MANIFEST_VERSION, "pages": self.pages, "assets": self.assets, "compressed": self.compressed}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def remove_output(self, output, public_folder=None):
+        for path in (output, *(output + suffix for suffix in COMPRESSED_SUFFIXES)):
+            if os.path.isfile(path):
+                os.unlink(path)
+        if public_folder is None:
+            return
+        relative = os.path.relpath(output, public_folder).replace(os.sep, "/")
+        self.compressed = [path for path in self.compressed if path not in (relative + suffix for suffix in COMPRESSED_SUFFIXES)]
+        stop_directory = os.path.abspath(public_folder)
+        directory = os.path.dirname(os.path.abspath(output))
+        while directory != stop_directory and directory.startswith(stop_directory + os.sep) and os.path.isdir(directory) and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+    def template_hash(self, template_path):
+        if template_path not in self._template_hashes:
+            self._template_hashes[template_path] = hash_file(template_path)
+        return self._template_hashes[template_path]
+
+    def is_fresh(self, source, source_hash, template_hash, output):
+        self._seen.add(source)
+        entry = self.pages.get(source)
+        if entry is None:
+            return False
+        return (entry["source_hash"] == source_hash
+                and entry["template_hash"] == template_hash
+                and entry["output"] == output
+                and os.path.exists(output))
+
+    def record(self, source, source_hash, template_hash, output):
+        self._seen.add(source)
+        self.pages[source] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "output": output,
+            "built_at": time.time(),
+        }
@@ -0,0 +1,169 @@
+import gzip
+import json
+import os
+import posixpath
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from bulkio import BulkIO, atomic_open, copy_atomic, read_text, write_atomic
+from manifest import hash_file
+
+ASSET_MANIFEST = "asset-manifest.json"
+FINGERPRINT_LENGTH = 8
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{%d}(\.[^./]+)$" % FINGERPRINT_LENGTH)
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json", ".svg", ".xml", ".txt", ".md", ".map"}
+
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+# gzip is always written; brotli only when the optional brotli package is installed
+COMPRESSORS = [(".gz", gzip_bytes)]
+try:
+    import brotli
+except ImportError:
+    pass
+else:
+    COMPRESSORS.append((".br", lambda data: brotli.compress(data, quality=11)))
+
+COMPRESSED_SUFFIXES = tuple(suffix for suffix, _ in COMPRESSORS)
+
+
+def fingerprinted_name(url, digest):
+    root, extension = posixpath.splitext(url)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+def load_asset_manifest(public_folder):
+    try:
+        with open(os.path.join(public_folder, ASSET_MANIFEST), encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def remove_output(path):
+    for candidate in (path, *(path + suffix for suffix in COMPRESSED_SUFFIXES)):
+        if os.path.isfile(candidate):
+            os.unlink(candidate)
+
+# copies every static asset to a name containing its content hash, so it can be cached
+# forever; returns {original url: fingerprinted url}, relative to the site root
+def fingerprint_assets(public_folder, assets, previous=None):
+    mapping = {}
+    for asset in assets:
+        url = asset.replace(os.sep, "/")
+        if url.endswith(".html"):
+            continue
+        source_path = os.path.join(public_folder, asset)
+        name = fingerprinted_name(url, hash_file(source_path))
+        mapping[url] = name
+        destination_path = os.path.join(public_folder, *name.split("/"))
+        if not os.path.exists(destination_path):
+            copy_atomic(source_path, destination_path)
+    for url, name in (previous or {}).items():
+        if mapping.get(url) != name:
+            remove_output(os.path.join(public_folder, *name.split("/")))
+    return mapping
+
+# href and src attributes pointing at an asset, by its original or an older fingerprinted
+# name, are pointed at the name in mapping; returns the html unchanged when nothing matches
+def rewrite_references(html, page_url, mapping):
+    def replace(match):
+        parts = urlsplit(match.group(2))
+        if parts.scheme or parts.netloc or not parts.path:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join("/" + page_url, parts.path)).lstrip("/")
+        if target not in mapping:
+            target = FINGERPRINT_PATTERN.sub(r"\1", target)
+            if target not in mapping:
+                return match.group(0)
+        path = posixpath.join(posixpath.dirname(parts.path), posixpath.basename(mapping[target]))
+        return f'{match.group(1)}="{urlunsplit(parts._replace(path=path))}"'
+    return URL_ATTRIBUTE_PATTERN.sub(replace, html)
+
+def rewrite_pages(public_folder, mapping):
+    rewritten = 0
+    for root, _, files in os.walk(public_folder):
+        relative = os.path.relpath(root, public_folder)
+        page_url = "" if relative == "." else relative.replace(os.sep, "/")
+        for name in files:
+            if not name.endswith(".html"):
+                continue
+            path = os.path.join(root, name)
+            html = read_text(path)
+            updated = rewrite_references(html, page_url, mapping)
+            if updated != html:
+                write_atomic(path, updated)
+                rewritten += 1
+    return rewritten
+
+# a compressed sibling carries its source's mtime, so unchanged files are skipped
+# without reading them; returns how many siblings were written
+def compress_file(path, compressors=COMPRESSORS):
+    source_stat = os.stat(path)
+    data = None
+    written = 0
+    for suffix, compress in compressors:
+        target = path + suffix
+        try:
+            if os.stat(target).st_mtime_ns == source_stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        if data is None:
+            with open(path, "rb") as file:
+                data = file.read()
+        with atomic_open(target, "wb") as file:
+            file.write(compress(data))
+        os.utime(target, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        written += 1
+    return written
+
+# zlib releases the GIL while compressing, so a thread pool compresses in parallel.
+# previous lists the siblings an earlier run wrote (relative to public_folder): only
+# those are ever removed, when their source is gone or compress is off, and paths in
+# protected (the synced static files) are never written or removed, so a static
+# data.tar.gz is left alone; returns (siblings written, siblings now present)
+def compress_outputs(public_folder, workers=1, compress=True, previous=(), protected=()):
+    previous = set(previous)
+    protected = set(protected)
+    jobs = []
+    siblings = []
+    for root, _, files in os.walk(public_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, public_folder).replace(os.sep, "/")
+            if relative in previous and relative not in protected:
+                if not compress or not os.path.exists(path[:path.rindex(".")]):
+                    os.unlink(path)
+            elif compress and os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                compressors = [(suffix, function) for suffix, function in COMPRESSORS if relative + suffix not in protected]
+                if compressors:
+                    jobs.append((path, compressors))
+                    siblings.extend(relative + suffix for suffix, _ in compressors)
+    if workers > 1 and len(jobs) > 1:
+        with BulkIO(workers) as io:
+            return sum(io.map(compress_file, jobs)), sorted(siblings)
+    return sum(compress_file(*job) for job in jobs), sorted(siblings)
+
+# runs after the static sync and page generation; without fingerprint, a previous
+# fingerprinting run is undone so pages point at the plain asset names again.
+# compressed is the "siblings" list a previous run returned in its stats
+def postprocess(public_folder, assets, fingerprint=True, compress=True, workers=1, compressed=()):
+    stats = {"fingerprinted": 0, "rewritten": 0, "compressed": 0}
+    previous = load_asset_manifest(public_folder)
+    if fingerprint:
+        mapping = fingerprint_assets(public_folder, assets, previous)
+        stats["fingerprinted"] = len(mapping)
+        stats["rewritten"] = rewrite_pages(public_folder, mapping)
+        if mapping != previous:
+            with atomic_open(os.path.join(public_folder, ASSET_MANIFEST)) as file:
+                json.dump(mapping, file, indent=1, sort_keys=True)
+    elif previous:
+        stats["rewritten"] = rewrite_pages(public_folder, {url: url for url in previous})
+        fingerprint_assets(public_folder, (), previous)
+        remove_output(os.path.join(public_folder, ASSET_MANIFEST))
+    protected = [asset.replace(os.sep, "/") for asset in assets]
+    stats["compressed"], stats["siblings"] = compress_outputs(public_folder, workers, compress, compressed, protected)
+    return stats
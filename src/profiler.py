@@ -0,0 +1,171 @@
+import contextlib
+import json
+import os
+import time
+
+import htmlnode
+
+# htmlnode functions timed while profiling is enabled; they are swapped for timed
+# wrappers on the module, so builds without --profile pay nothing for them
+INSTRUMENTED_FUNCTIONS = {
+    "markdown_to_blocks": "markdown_to_blocks",
+    "iter_blocks": "markdown_to_blocks",
+    "block_to_block_type": "block typing",
+    "text_to_textnodes": "inline parsing",
+    # new blocks are serialized into the block cache while the page is parsed
+    "nodes_to_html": "to_html",
+}
+
+_NULL_STAGE = contextlib.nullcontext()
+_active = None
+_originals = {}
+
+
+class Profiler:
+    def __init__(self):
+        self.pid = os.getpid()
+        self.page = None
+        self.events = []
+        self.totals = {}
+        self.pages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    @contextlib.contextmanager
+    def page_scope(self, page):
+        previous, self.page = self.page, page
+        try:
+            with self.stage("page"):
+                yield
+        finally:
+            self.page = previous
+
+    def record(self, name, start, end):
+        duration = end - start
+        add_time(self.totals, name, 1, duration)
+        if self.page is not None:
+            add_time(self.pages.setdefault(self.page, {}), name, 1, duration)
+        event = {"name": name, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": self.pid, "tid": self.pid}
+        if self.page is not None:
+            event["args"] = {"page": self.page}
+        self.events.append(event)
+
+    # worker processes hand their measurements to the parent's profiler
+    def drain(self):
+        drained = {"events": self.events, "totals": self.totals, "pages": self.pages}
+        self.events = []
+        self.totals = {}
+        self.pages = {}
+        return drained
+
+    def merge(self, drained):
+        self.events.extend(drained["events"])
+        merge_totals(self.totals, drained["totals"])
+        for page, totals in drained["pages"].items():
+            merge_totals(self.pages.setdefault(page, {}), totals)
+
+    def slowest_pages(self, count=10):
+        page_times = [(totals.get("page", [0, 0.0])[1], page) for page, totals in self.pages.items()]
+        return sorted(page_times, reverse=True)[:count]
+
+    def report(self, top=10):
+        lines = [f"{'stage':<20}{'calls':>10}{'total ms':>12}{'mean us':>12}"]
+        for name, (calls, seconds) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<20}{calls:>10}{seconds * 1000:>12.2f}{seconds / calls * 1e6:>12.1f}")
+        slowest = self.slowest_pages(top)
+        if slowest:
+            lines.append("")
+            lines.append(f"slowest {len(slowest)} page(s):")
+            for seconds, page in slowest:
+                stages = sorted(((total[1], name) for name, total in self.pages[page].items() if name != "page"), reverse=True)
+                breakdown = ", ".join(f"{name} {stage_seconds * 1000:.2f}" for stage_seconds, name in stages)
+                lines.append(f"{seconds * 1000:10.2f} ms  {page}  ({breakdown})")
+        return "\n".join(lines)
+
+    # Chrome trace-event format, loadable in chrome://tracing or Perfetto
+    def write_trace(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+
+
+def add_time(totals, name, calls, seconds):
+    total = totals.setdefault(name, [0, 0.0])
+    total[0] += calls
+    total[1] += seconds
+
+def merge_totals(totals, other):
+    for name, (calls, seconds) in other.items():
+        add_time(totals, name, calls, seconds)
+
+
+def timed(name, function):
+    def wrapper(*args, **kwargs):
+        with _active.stage(name):
+            return function(*args, **kwargs)
+    wrapper.__wrapped__ = function
+    return wrapper
+
+# generators do their work between next() calls, so only the time spent inside them
+# is added up and recorded as one call once they are exhausted
+def timed_iter(name, function):
+    def wrapper(*args, **kwargs):
+        iterator = function(*args, **kwargs)
+        profiler = _active
+        start = time.perf_counter()
+        spent = 0.0
+        try:
+            while True:
+                resumed = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    spent += time.perf_counter() - resumed
+                yield item
+        finally:
+            profiler.record(name, start, start + spent)
+    wrapper.__wrapped__ = function
+    return wrapper
+
+def enable(profiler=None):
+    import inspect
+
+    global _active
+    _active = profiler or Profiler()
+    for function_name, stage_name in INSTRUMENTED_FUNCTIONS.items():
+        if function_name not in _originals:
+            _originals[function_name] = getattr(htmlnode, function_name)
+            original = _originals[function_name]
+            wrap = timed_iter if inspect.isgeneratorfunction(original) else timed
+            setattr(htmlnode, function_name, wrap(stage_name, original))
+    return _active
+
+def disable():
+    global _active
+    _active = None
+    for function_name, function in _originals.items():
+        setattr(htmlnode, function_name, function)
+    _originals.clear()
+
+def active():
+    return _active
+
+def stage(name):
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name)
+
+def page_scope(page):
+    if _active is None:
+        return _NULL_STAGE
+    return _active.page_scope(page)
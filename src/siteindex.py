@@ -0,0 +1,170 @@
+import contextlib
+import json
+import os
+import re
+import time
+
+# escapes & < > like xml.sax.saxutils.escape, without importing it (and urllib) on startup
+from htmlnode import escape_text as escape, iter_blocks, block_to_block_type, text_to_textnodes, IMAGE_PATTERN, LINK_PATTERN
+from bulkio import atomic_open
+
+INDEX_VERSION = 1
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+SEARCH_INDEX_NAME = "search-index.json"
+FEED_ENTRIES = 20
+SUMMARY_LENGTH = 200
+WORD_PATTERN = re.compile(r"\w{2,}")
+
+
+def plain_text(block):
+    return "".join(node.text for node in text_to_textnodes(block))
+
+def summarize(text, length=SUMMARY_LENGTH):
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+# summary (the first paragraph as plain text) and distinct words of a page, added up
+# one block at a time, so they can be gathered while the page renders; words come from
+# everything but code blocks, with link and image urls left out
+class PageMetadata:
+    def __init__(self):
+        self.summary = ""
+        self.words = set()
+
+    def add_block(self, block, block_type):
+        if block_type == "code":
+            return
+        if block_type == "paragraph" and not self.summary:
+            self.summary = summarize(plain_text(block))
+        text = LINK_PATTERN.sub(r"\1", IMAGE_PATTERN.sub(r"\1", block))
+        self.words.update(word.lower() for word in WORD_PATTERN.findall(text))
+
+    def result(self, title):
+        return {"title": title, "summary": self.summary, "words": sorted(self.words)}
+
+def page_metadata(markdown, title):
+    metadata = PageMetadata()
+    for _, block in iter_blocks(markdown):
+        metadata.add_block(block, block_to_block_type(block))
+    return metadata.result(title)
+
+def page_link(url):
+    return "/" if not url else f"/{url}/"
+
+
+class SiteIndex:
+    # metadata of every page, kept in .build between builds; only rebuilt pages are
+    # scanned again, and the sitemap, feed and search index are written from it
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        # the settings the output files were last written with
+        self.written_with = None
+        self.changed = False
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        if data.get("version") != INDEX_VERSION:
+            return self
+        self.pages = data.get("pages", {})
+        self.written_with = data.get("written_with")
+        return self
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_open(self.path) as file:
+            json.dump({"version": INDEX_VERSION, "pages": self.pages, "written_with": self.written_with}, file, sort_keys=True)
+
+    # metadata as page_metadata returns it, or PageMetadata.result for a rendered page
+    def record(self, source, url, metadata):
+        metadata = dict(metadata, url=url)
+        metadata["mtime"] = os.stat(source).st_mtime
+        if self.pages.get(source) != metadata:
+            self.pages[source] = metadata
+            self.changed = True
+
+    def prune(self, sources):
+        sources = set(sources)
+        for source in [source for source in self.pages if source not in sources]:
+            del self.pages[source]
+            self.changed = True
+
+    def entries(self):
+        return sorted(self.pages.values(), key=lambda page: page["url"])
+
+    def sitemap(self, site_url):
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for page in self.entries():
+            lastmod = time.strftime("%Y-%m-%d", time.gmtime(page["mtime"]))
+            lines.append(f"<url><loc>{escape(site_url + page_link(page['url']))}</loc><lastmod>{lastmod}</lastmod></url>")
+        lines.append("</urlset>")
+        return "\n".join(lines) + "\n"
+
+    # RSS 2.0 with the most recently changed pages first
+    def feed(self, site_url, title):
+        from email.utils import formatdate
+
+        pages = sorted(self.entries(), key=lambda page: page["mtime"], reverse=True)[:FEED_ENTRIES]
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0"><channel>',
+            f"<title>{escape(title)}</title><link>{escape(site_url + '/')}</link><description>{escape(title)}</description>",
+        ]
+        for page in pages:
+            link = escape(site_url + page_link(page["url"]))
+            lines.append(
+                f"<item><title>{escape(page['title'])}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{formatdate(page['mtime'], usegmt=True)}</pubDate><description>{escape(page['summary'])}</description></item>"
+            )
+        lines.append("</channel></rss>")
+        return "\n".join(lines) + "\n"
+
+    # pages are numbered in url order; every term maps to the sorted ids of the pages
+    # containing it
+    def search_index(self):
+        pages = self.entries()
+        postings = {}
+        for page_id, page in enumerate(pages):
+            for word in page["words"]:
+                postings.setdefault(word, []).append(page_id)
+        return {
+            "pages": [[page_link(page["url"]), page["title"], page["summary"]] for page in pages],
+            "terms": dict(sorted(postings.items())),
+        }
+
+    # the feed is named after the home page; the files are written again only when a
+    # page's metadata or the site url changed, or one of them is missing
+    # the sitemap and feed need absolute urls, so without a site url they are not written,
+    # and ones an earlier build wrote with a url are removed
+    def write(self, public_folder, site_url=None):
+        home = next((page for page in self.pages.values() if page["url"] == ""), None)
+        title = home["title"] if home is not None else "Feed"
+        if self.written_with != [site_url]:
+            if not site_url and self.written_with and self.written_with[0]:
+                for name in (SITEMAP_NAME, FEED_NAME):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(os.path.join(public_folder, name))
+            self.written_with = [site_url]
+            self.changed = True
+        outputs = {SEARCH_INDEX_NAME: lambda: json.dumps(self.search_index(), separators=(",", ":"), ensure_ascii=False)}
+        if site_url:
+            outputs[SITEMAP_NAME] = lambda: self.sitemap(site_url.rstrip("/"))
+            outputs[FEED_NAME] = lambda: self.feed(site_url.rstrip("/"), title)
+        written = 0
+        for name, render in outputs.items():
+            path = os.path.join(public_folder, name)
+            if self.changed or not os.path.exists(path):
+                with atomic_open(path) as file:
+                    file.write(render())
+                written += 1
+        self.changed = False
+        return written
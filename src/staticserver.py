@@ -0,0 +1,309 @@
+import logging
+import mimetypes
+import os
+import selectors
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import unquote, urlsplit
+
+from postprocess import FINGERPRINT_PATTERN
+
+logger = logging.getLogger(__name__)
+
+# files above this size are not cached and go out with sendfile() instead of write()
+SENDFILE_THRESHOLD = 256 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# preferred first when the client accepts several
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class StaticFile:
+    __slots__ = ("path", "size", "mtime_ns", "etag", "last_modified", "body")
+
+    def __init__(self, path, stat, body=None):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.body = body
+
+
+# LRU of small files keyed by path; every lookup still stats the file, so an entry
+# is read again as soon as the file's size or mtime changes
+class FileCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        if stat.st_size > SENDFILE_THRESHOLD or stat.st_size > self.max_bytes:
+            return StaticFile(path, stat)
+        with open(path, "rb") as file:
+            entry = StaticFile(path, stat, file.read())
+        with self.lock:
+            previous = self.entries.pop(path, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self.entries[path] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+        return entry
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and params not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+# a compressed sibling only counts while it carries its source's mtime (see postprocess)
+def compressed_variant(path, stat, accept_encoding):
+    accepted = accepted_encodings(accept_encoding)
+    for coding, suffix in ENCODINGS:
+        if coding in accepted or "*" in accepted:
+            try:
+                if os.stat(path + suffix).st_mtime_ns == stat.st_mtime_ns:
+                    return coding, path + suffix
+            except FileNotFoundError:
+                pass
+    return None, path
+
+
+class StaticRequestHandler(BaseHTTPRequestHandler):
+    # one handler lives as long as its connection; StaticServer calls
+    # handle_one_request each time the connection has a request ready
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes; with Nagle on, keep-alive clients wait out
+    # a delayed ACK (about 40 ms) on every response
+    disable_nagle_algorithm = True
+    # idle keep-alive connections are closed after this many seconds
+    timeout = 15
+    head_only = False
+
+    def __init__(self, request, client_address, server):
+        self.request = request
+        self.client_address = client_address
+        self.server = server
+        self.setup()
+
+    # whether the next request's bytes have already arrived, buffered by rfile or
+    # waiting on the socket; never blocks
+    def request_ready(self):
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def do_HEAD(self):
+        self.head_only = True
+        self.do_GET()
+
+    def do_GET(self):
+        url_path = unquote(urlsplit(self.path).path)
+        root = self.server.root
+        file_path = os.path.realpath(os.path.join(root, url_path.lstrip("/")))
+        if file_path != root and not file_path.startswith(root + os.sep):
+            self.send_error(404)
+            return
+        if os.path.isdir(file_path):
+            if not url_path.endswith("/"):
+                # like http.server, so relative links inside the page keep working
+                self.send_response(301)
+                self.send_header("Location", url_path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            file_path = os.path.join(file_path, "index.html")
+        try:
+            stat = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            self.send_error(404)
+            return
+        content_type, _ = mimetypes.guess_type(file_path)
+        if content_type is None:
+            content_type = "application/octet-stream"
+        elif content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        encoding, body_path = compressed_variant(file_path, stat, self.headers.get("Accept-Encoding"))
+        entry = self.server.cache.get(body_path)
+
+        not_modified = self.not_modified(entry)
+        self.send_response(304 if not_modified else 200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", entry.etag)
+        self.send_header("Last-Modified", entry.last_modified)
+        if FINGERPRINT_PATTERN.search(file_path):
+            self.send_header("Cache-Control", IMMUTABLE_CACHE_CONTROL)
+        else:
+            self.send_header("Cache-Control", REVALIDATE_CACHE_CONTROL)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if encoding is not None or os.path.exists(file_path + ".gz"):
+            self.send_header("Vary", "Accept-Encoding")
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Length", str(entry.size))
+        self.end_headers()
+        if self.head_only:
+            return
+        if entry.body is not None:
+            self.wfile.write(entry.body)
+        else:
+            with open(entry.path, "rb") as file:
+                # socket.sendfile uses os.sendfile where the platform has it
+                self.connection.sendfile(file)
+
+    def not_modified(self, entry):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match.strip() == "*" or entry.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return entry.mtime_ns // 1_000_000_000 <= since
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+# like ThreadingHTTPServer, but requests are handled by a fixed pool of threads
+# instead of one new thread per connection. A connection only holds a pool thread
+# while it has a request to serve: idle keep-alive connections wait in a selector on
+# their own thread and go back to the pool when readable, so idle clients cannot
+# starve the pool
+class StaticServer(HTTPServer):
+    def __init__(self, address, root, threads=16, cache_max_bytes=64 * 1024 * 1024):
+        super().__init__(address, StaticRequestHandler)
+        self.root = os.path.realpath(root)
+        self.cache = FileCache(cache_max_bytes)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="static")
+        self.selector = selectors.DefaultSelector()
+        # handlers parked by workers, registered by the idle thread; the socket pair wakes it
+        self.parked = []
+        self.parked_lock = threading.Lock()
+        self.wake_receiver, self.wake_sender = socket.socketpair()
+        self.wake_receiver.setblocking(False)
+        self.selector.register(self.wake_receiver, selectors.EVENT_READ)
+        self.closing = False
+        self.idle_thread = threading.Thread(target=self.watch_idle, name="static-idle", daemon=True)
+        self.idle_thread.start()
+
+    def process_request(self, request, client_address):
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        self.park(handler)
+
+    def park(self, handler):
+        with self.parked_lock:
+            self.parked.append(handler)
+        self.wake_sender.send(b"\0")
+
+    def watch_idle(self):
+        deadlines = {}
+        while not self.closing:
+            for key, _ in self.selector.select(timeout=1):
+                if key.fileobj is self.wake_receiver:
+                    try:
+                        self.wake_receiver.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    with self.parked_lock:
+                        parked, self.parked = self.parked, []
+                    for handler in parked:
+                        self.selector.register(handler.connection, selectors.EVENT_READ, handler)
+                        deadlines[handler] = time.monotonic() + handler.timeout
+                else:
+                    self.selector.unregister(key.fileobj)
+                    del deadlines[key.data]
+                    self.executor.submit(self.serve_connection, key.data)
+            now = time.monotonic()
+            for handler in [handler for handler, deadline in deadlines.items() if deadline <= now]:
+                self.selector.unregister(handler.connection)
+                del deadlines[handler]
+                self.close_connection(handler)
+        with self.parked_lock:
+            parked, self.parked = self.parked, []
+        for handler in [*deadlines, *parked]:
+            self.close_connection(handler)
+
+    # serves the requests that are ready, then parks the connection again
+    def serve_connection(self, handler):
+        try:
+            while True:
+                handler.close_connection = True
+                handler.handle_one_request()
+                if handler.close_connection:
+                    break
+                if not handler.request_ready():
+                    self.park(handler)
+                    return
+        except ConnectionError as error:
+            # a client that went away is ordinary, not a server error
+            logger.debug("%s - connection closed: %s", handler.address_string(), error)
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+        self.close_connection(handler)
+
+    def close_connection(self, handler):
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        self.shutdown_request(handler.request)
+
+    def server_close(self):
+        super().server_close()
+        self.closing = True
+        self.wake_sender.send(b"\0")
+        self.idle_thread.join()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.selector.close()
+        self.wake_sender.close()
+        self.wake_receiver.close()
+
+
+def serve_static(root, host="localhost", port=8888, threads=16, cache_max_bytes=64 * 1024 * 1024):
+    server = StaticServer((host, port), root, threads, cache_max_bytes)
+    logger.info("Serving %s on http://%s:%d/ with %d threads", root, host, server.server_address[1], threads)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+# {{> partials/header.html }}, relative to the directory of the file containing it
+INCLUDE_PATTERN = re.compile(r"\{\{>\s*([\w./-]+)\s*\}\}")
+
+# content hash of a partial -> its text with nested includes expanded, and the files
+# those came from with their hashes; a partial is expanded once no matter how many
+# templates use it, and again only when it or one of its nested partials changed
+_partial_cache = {}
+
+def read_partial(path):
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    return text, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def expand_includes(source, base_dir, including=()):
+    includes = []
+
+    def include(match):
+        path = os.path.normpath(os.path.join(base_dir, match.group(1)))
+        if path in including:
+            raise ValueError(f"Include cycle: {' -> '.join((*including, path))}")
+        text, digest = read_partial(path)
+        key = (digest, os.path.dirname(path))
+        entry = _partial_cache.get(key)
+        if entry is None or any(read_partial(nested)[1] != nested_digest for nested, nested_digest in entry[1]):
+            expanded, nested = expand_includes(text, os.path.dirname(path), (*including, path))
+            entry = _partial_cache[key] = (expanded, [(nested_path, read_partial(nested_path)[1]) for nested_path in dict.fromkeys(nested)])
+        includes.append(path)
+        includes.extend(nested_path for nested_path, _ in entry[1])
+        return entry[0]
+
+    return INCLUDE_PATTERN.sub(include, source), includes
+
+class Template:
+    # parsed once into (literal, placeholder name) segments; the last segment has no name
+    # partials are spliced into the literals when the template is parsed, so pages get
+    # them as pre-rendered text; placeholders inside a partial are filled per page
+    def __init__(self, source, base_dir="."):
+        source, includes = expand_includes(source, base_dir)
+        self.includes = list(dict.fromkeys(includes))
+        self.segments = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.segments.append((source[position:match.start()], match.group(1)))
+            position = match.end()
+        self.segments.append((source[position:], None))
+
+    def placeholders(self):
+        return {name for _, name in self.segments if name is not None}
+
+    # context values may be strings, nodes with write_html/iter_html, or iterables of chunks;
+    # placeholders missing from the context render as nothing
+    def iter_render(self, context):
+        for literal, name in self.segments:
+            if literal:
+                yield literal
+            if name is None:
+                continue
+            value = context.get(name, "")
+            if isinstance(value, str):
+                yield value
+            elif hasattr(value, "iter_html"):
+                yield from value.iter_html()
+            else:
+                yield from value
+
+    def render(self, context):
+        return "".join(self.iter_render(context))
+
+    def write(self, file, context):
+        for literal, name in self.segments:
+            file.write(literal)
+            if name is None:
+                continue
+            value = context.get(name, "")
+            if isinstance(value, str):
+                file.write(value)
+            elif hasattr(value, "write_html"):
+                value.write_html(file)
+            else:
+                for chunk in value:
+                    file.write(chunk)
+
+    def __repr__(self):
+        return f"Template({self.segments})"
+
+
+_template_cache = {}
+
+def file_stamps(paths):
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+# a template is read and parsed again only when the mtime or size of it or one of
+# its partials changes
+def load_template(path):
+    cached = _template_cache.get(path)
+    if cached is not None and cached[0] == file_stamps([path, *cached[1].includes]):
+        return cached[1]
+    with open(path, encoding="utf-8") as file:
+        template = Template(file.read(), os.path.dirname(path))
+    _template_cache[path] = (file_stamps([path, *template.includes]), template)
+    return template
+
+def clear_template_cache():
+    _template_cache.clear()
+    _partial_cache.clear()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache, block_key
+from htmlnode import markdown_to_html_node
+
+FOOTER = "> Thanks for reading\n> see you **next** time"
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_key_depends_on_text_and_type(self):
+        self.assertEqual(block_key("a", "paragraph"), block_key("a", "paragraph"))
+        self.assertNotEqual(block_key("a", "paragraph"), block_key("a", "quote"))
+        self.assertNotEqual(block_key("a", "paragraph"), block_key("b", "paragraph"))
+
+    def test_lru_eviction_is_bounded_by_size(self):
+        cache = BlockCache(max_bytes=30)
+        cache.put("k1", "x" * 8)
+        cache.put("k2", "y" * 8)
+        cache.put("k3", "z" * 8)
+        self.assertEqual(cache.get("k1"), "x" * 8)
+        cache.put("k4", "w" * 8)
+        self.assertIsNone(cache.get("k2"))
+        self.assertEqual(list(cache.entries), ["k3", "k1", "k4"])
+        self.assertLessEqual(cache.size, 30)
+        cache.put("huge", "h" * 100)
+        self.assertNotIn("huge", cache.entries)
+
+    def test_stats(self):
+        cache = BlockCache()
+        cache.put("k", "<p>x</p>")
+        cache.get("k")
+        cache.get("missing")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_drain_and_merge(self):
+        worker = BlockCache()
+        worker.put("k", "<p>x</p>")
+        worker.get("k")
+        drained = worker.drain(include_entries=True)
+        self.assertEqual((worker.hits, worker.new_entries), (0, {}))
+        parent = BlockCache()
+        parent.merge(drained)
+        self.assertEqual(parent.hits, 1)
+        self.assertEqual(parent.entries["k"], "<p>x</p>")
+
+    def test_markdown_output_is_unchanged(self):
+        cache = BlockCache()
+        pages = [f"# Page {n}\n\nBody *{n}*\n\n{FOOTER}" for n in range(3)]
+        for page in pages:
+            self.assertEqual(markdown_to_html_node(page, cache).to_html(), markdown_to_html_node(page).to_html())
+        # the footer is parsed once and reused by the other two pages
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 3 * 3 - 2)
+
+    def test_new_blocks_are_serialized_once(self):
+        cache = BlockCache()
+        node = markdown_to_html_node(f"# Title\n\n{FOOTER}", cache)
+        # each new block is added as the fragment it was cached as
+        self.assertEqual([child.value for child in node.children], list(cache.entries.values()))
+        self.assertTrue(all(child.safe for child in node.children))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "blocks.json")
+            cache = BlockCache()
+            markdown_to_html_node(FOOTER, cache)
+            cache.save(path)
+            loaded = BlockCache().load(path)
+            self.assertEqual(loaded.entries, cache.entries)
+            markdown_to_html_node(FOOTER, loaded)
+            self.assertEqual((loaded.hits, loaded.misses), (1, 0))
+            self.assertEqual(BlockCache().load(os.path.join(directory, "missing.json")).entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
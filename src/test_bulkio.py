@@ -0,0 +1,52 @@
+import os
+import unittest
+
+from bulkio import BulkIO, atomic_open, copy_atomic, read_text, write_atomic
+from fixtures import TempDirTestCase
+
+
+class TestAtomicWrites(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp.name, "index.html")
+
+    def test_failed_write_keeps_previous_file(self):
+        write_atomic(self.path, "old")
+        with self.assertRaises(RuntimeError):
+            with atomic_open(self.path) as file:
+                file.write("half written")
+                raise RuntimeError("render failed")
+        self.assertEqual(read_text(self.path), "old")
+        self.assertEqual(os.listdir(self.tmp.name), ["index.html"])
+
+    def test_copy_keeps_mtime(self):
+        source = os.path.join(self.tmp.name, "source.css")
+        write_atomic(source, "body {}")
+        os.utime(source, ns=(0, 10**9))
+        copy_atomic(source, self.path)
+        self.assertEqual(read_text(self.path), "body {}")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 10**9)
+
+
+class TestBulkIO(unittest.TestCase):
+    def test_map_keeps_order(self):
+        with BulkIO(3) as io:
+            self.assertEqual(io.map(lambda a, b: a * b, [(n, 2) for n in range(20)]), [n * 2 for n in range(20)])
+            with self.assertRaises(ZeroDivisionError):
+                io.map(lambda n: 1 / n, [(1,), (0,)])
+
+    def test_pipeline_reports_errors_per_item(self):
+        written = {}
+        with BulkIO(2) as io:
+            errors = io.pipeline(
+                range(5),
+                lambda n: n * 10,
+                lambda n, data: 1 // (data - 20),
+                written.__setitem__,
+            )
+        self.assertEqual([type(error) for error in errors], [type(None), type(None), ZeroDivisionError, type(None), type(None)])
+        self.assertEqual(sorted(written), [0, 1, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import shutil
+import unittest
+
+import depgraph
+from bulkio import BulkIO
+from depgraph import DependencyGraph, markdown_references, page_url, reference_key, url_key
+from fixtures import TempDirTestCase
+from main import generate_pages_recursive
+from manifest import BuildManifest
+
+
+class TestReferences(unittest.TestCase):
+    def test_markdown_references_skip_code(self):
+        md = "![pic](/images/a.png) and [home](/)\n\n```\n[not](/a/link)\n```\n\n[post](../post)"
+        self.assertEqual(markdown_references(md), (["/images/a.png"], ["/", "../post"]))
+
+    def test_reference_key(self):
+        self.assertEqual(reference_key("/blog/post/", ""), "blog/post")
+        self.assertEqual(reference_key("/blog/post/index.html#top", ""), "blog/post")
+        self.assertEqual(reference_key("../other", "blog/post"), "blog/other")
+        self.assertEqual(reference_key("/", "blog"), "")
+        self.assertIsNone(reference_key("https://example.com/x", ""))
+        self.assertIsNone(reference_key("#section", ""))
+
+    def test_page_url(self):
+        self.assertEqual(page_url("public", "public"), "")
+        self.assertEqual(page_url(os.path.join("public", "blog", "post"), "public"), "blog/post")
+        self.assertEqual(url_key(page_url(os.path.join("public", "blog"), "public")), "blog")
+
+
+class TestIncrementalRebuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.write(os.path.join(self.static, "images", "ring.png"), "png")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[gallery](/gallery) [missing](/nowhere)")
+        self.write(os.path.join(self.content, "gallery", "index.md"), "# Gallery\n\n![ring](/images/ring.png)\n\n![map](/images/map.png)")
+        self.write(os.path.join(self.content, "about", "index.md"), "# About\n\nplain text")
+
+    def build(self, **options):
+        state = os.path.join(self.tmp.name, ".build")
+        manifest = BuildManifest(os.path.join(state, "manifest.json")).load()
+        graph = DependencyGraph(os.path.join(state, "depgraph.json")).load()
+        before = {page: dict(entry) for page, entry in manifest.pages.items()}
+        failures = generate_pages_recursive(self.content, self.template, self.public, manifest, graph=graph, static_dir=self.static, **options)
+        self.assertEqual(failures, [])
+        manifest.save()
+        graph.save()
+        rebuilt = {os.path.relpath(page, self.content) for page, entry in manifest.pages.items() if before.get(page) != entry}
+        return rebuilt, graph
+
+    def test_minimal_rebuild_set(self):
+        rebuilt, graph = self.build()
+        self.assertEqual(len(rebuilt), 3)
+        self.assertEqual(graph.broken_references(), [
+            (os.path.join(self.content, "gallery", "index.md"), "image", "/images/map.png"),
+            (os.path.join(self.content, "index.md"), "link", "/nowhere"),
+        ])
+        self.assertEqual(self.build()[0], set())
+
+        # a changed asset rebuilds only the page showing it
+        self.write(os.path.join(self.static, "images", "ring.png"), "new png")
+        self.assertEqual(self.build()[0], {os.path.join("gallery", "index.md")})
+        self.assertEqual(graph.dependents(os.path.join(self.static, "images", "ring.png")), [os.path.join(self.content, "gallery", "index.md")])
+
+        # a missing target that appears rebuilds the pages pointing at it
+        self.write(os.path.join(self.content, "nowhere", "index.md"), "# Somewhere")
+        rebuilt, graph = self.build()
+        self.assertEqual(rebuilt, {"index.md", os.path.join("nowhere", "index.md")})
+        self.assertEqual([url for _, _, url in graph.broken_references()], ["/images/map.png"])
+
+        # a deleted page rebuilds the pages linking to it
+        os.remove(os.path.join(self.content, "gallery", "index.md"))
+        self.assertEqual(self.build()[0], {"index.md"})
+
+    def test_every_render_path_collects_references(self):
+        expected = self.build()[1].pages
+        io = BulkIO(2)
+        self.addCleanup(io.close)
+        for options in ({"workers": 2}, {"io": io}):
+            shutil.rmtree(os.path.join(self.tmp.name, ".build"))
+            shutil.rmtree(self.public)
+            self.assertEqual(self.build(**options)[1].pages, expected)
+
+    def test_unchanged_graph_is_not_written(self):
+        self.build()
+        path = os.path.join(self.tmp.name, ".build", "depgraph.json")
+        os.utime(path, ns=(0, 0))
+        self.build()
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        self.write(os.path.join(self.content, "about", "index.md"), "# About\n\n[home](/)")
+        self.build()
+        self.assertNotEqual(os.stat(path).st_mtime_ns, 0)
+
+    def test_unchanged_assets_are_not_hashed(self):
+        self.build()
+        ring = os.path.join(self.static, "images", "ring.png")
+        hashed = []
+        hash_file = depgraph.hash_file
+        depgraph.hash_file = lambda path: hashed.append(path) or hash_file(path)
+        self.addCleanup(setattr, depgraph, "hash_file", hash_file)
+        self.assertEqual(self.build()[0], set())
+        self.assertEqual(hashed, [])
+
+        # a touched asset is hashed once, rebuilds nothing and keeps its new stamp
+        os.utime(ring, ns=(1, 1))
+        self.assertEqual(self.build()[0], set())
+        self.assertEqual(self.build()[0], set())
+        self.assertEqual(hashed, [ring])
+
+    def test_partial_change_rebuilds_pages(self):
+        footer = os.path.join(self.tmp.name, "footer.html")
+        self.write(footer, "<footer>one</footer>")
+        self.write(self.template, "{{ Title }}{{ Content }}{{> footer.html }}")
+        rebuilt, graph = self.build()
+        self.assertEqual(len(rebuilt), 3)
+        self.assertEqual(len(graph.dependents(footer)), 3)
+        self.assertEqual(self.build()[0], set())
+        self.write(footer, "<footer>two</footer>")
+        os.utime(footer, ns=(0, 0))
+        self.assertEqual(len(self.build()[0]), 3)
+        with open(os.path.join(self.public, "about", "index.html")) as file:
+            self.assertIn("<footer>two</footer>", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
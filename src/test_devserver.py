@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+import unittest
+import urllib.request
+
+from devserver import DevServer, DevSite, FileWatcher, page_key, LIVE_RELOAD_SCRIPT
+from fixtures import TempDirTestCase
+from main import collect_page_jobs, render_page
+
+
+class TestDevSite(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "post"))
+        os.makedirs(self.static)
+        self.write(self.template, "<body>{{ Title }}{{ Content }}</body>")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.renders = []
+        self.site = DevSite(self.static, self.template, self.render, self.collect)
+
+    def write(self, path, text):
+        super().write(path, text)
+        # make sure the change is visible to mtime polling even on coarse clocks
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def render(self, source):
+        self.renders.append(source)
+        return render_page(source, self.template)
+
+    def collect(self):
+        return {dest: source for source, dest in collect_page_jobs(self.content, "")}
+
+    def test_page_key(self):
+        self.assertEqual(page_key("/"), "")
+        self.assertEqual(page_key("/index.html"), "")
+        self.assertEqual(page_key("/post/"), "post")
+        self.assertEqual(page_key("/post/index.html"), "post")
+
+    def test_pages_are_rendered_once_and_cached(self):
+        content_type, body = self.site.get("/post/")
+        self.assertEqual(content_type, "text/html; charset=utf-8")
+        self.assertEqual(body.decode(), f"<body>Post<div><h1>Post</h1></div>{LIVE_RELOAD_SCRIPT}</body>")
+        self.site.get("/post/index.html")
+        self.assertEqual(len(self.renders), 1)
+        self.assertEqual(self.site.get("/index.css"), ("text/css", b"body {}"))
+        self.assertIsNone(self.site.get("/missing.png"))
+        self.assertIsNone(self.site.get("/../template.html"))
+
+    def test_only_the_changed_page_is_rebuilt(self):
+        watcher = FileWatcher([self.content, self.static, self.template])
+        self.site.get("/")
+        self.site.get("/post/")
+        post = os.path.join(self.content, "post", "index.md")
+        self.write(post, "# Edited")
+        changed = watcher.poll()
+        self.assertEqual(changed, {post})
+        self.renders.clear()
+        self.site.apply_changes(changed)
+        self.assertEqual(self.renders, [post])
+        self.assertIn(b"Edited", self.site.get("/post/")[1])
+        self.assertEqual(self.site.generation, 1)
+
+    def test_template_change_drops_all_pages(self):
+        watcher = FileWatcher([self.content, self.static, self.template])
+        self.site.get("/")
+        self.write(self.template, "<body>new {{ Title }}</body>")
+        self.site.apply_changes(watcher.poll())
+        self.assertEqual(self.site.pages, {})
+        self.assertIn(b"new Home", self.site.get("/")[1])
+
+    def test_new_and_removed_pages(self):
+        watcher = FileWatcher([self.content, self.static, self.template])
+        os.makedirs(os.path.join(self.content, "new"))
+        self.write(os.path.join(self.content, "new", "index.md"), "# New")
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.site.apply_changes(watcher.poll())
+        self.assertIn(b"New", self.site.get("/new/")[1])
+        self.assertIsNone(self.site.get("/post/"))
+
+    def test_static_change_is_served(self):
+        watcher = FileWatcher([self.content, self.static, self.template])
+        self.site.get("/index.css")
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        self.site.apply_changes(watcher.poll())
+        self.assertEqual(self.site.get("/index.css")[1], b"body { color: red }")
+
+    def test_live_reload_over_http(self):
+        server = DevServer(("localhost", 0), self.site)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            base = f"http://localhost:{server.server_address[1]}"
+            # request lines go to the logger, not straight to stderr
+            with self.assertLogs("devserver", "DEBUG") as logs, urllib.request.urlopen(base + "/post/") as response:
+                self.assertIn(b"<h1>Post</h1>", response.read())
+            self.assertIn('"GET /post/ HTTP/1.1" 200', logs.output[0])
+            events = urllib.request.urlopen(base + "/__livereload", timeout=5)
+            time.sleep(0.1)
+            self.site.apply_changes({os.path.join(self.content, "post", "index.md")})
+            self.assertEqual(events.readline(), b"data: reload\n")
+            events.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
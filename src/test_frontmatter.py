@@ -0,0 +1,115 @@
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from frontmatter import read_front_matter, scan_metadata, scan_pages, split_front_matter, template_variables
+from htmlnode import MarkdownError
+from main import generate_page, render_page, use_block_cache
+
+YAML_PAGE = """---
+title: "Riders of Rohan"
+date: 2024-11-11
+draft: false
+order: 3
+tags: [horses, "rohan, west"]
+authors:
+  - Éomer
+  - Théoden
+---
+# Heading
+
+Body text.
+"""
+
+TOML_PAGE = """+++
+title = "Minas Tirith"
+tags = ["gondor"]
+count = 7
++++
+
+# Heading
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_lite(self):
+        metadata, body, first_line = split_front_matter(YAML_PAGE)
+        self.assertEqual(metadata, {
+            "title": "Riders of Rohan",
+            "date": "2024-11-11",
+            "draft": False,
+            "order": 3,
+            "tags": ["horses", "rohan, west"],
+            "authors": ["Éomer", "Théoden"],
+        })
+        self.assertEqual(body, "# Heading\n\nBody text.\n")
+        self.assertEqual(first_line, 11)
+
+    def test_toml_lite(self):
+        metadata, body, first_line = split_front_matter(TOML_PAGE)
+        self.assertEqual(metadata, {"title": "Minas Tirith", "tags": ["gondor"], "count": 7})
+        self.assertEqual((body, first_line), ("\n# Heading\n", 6))
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\n---\n"), ({}, "# Title\n\n---\n", 1))
+        file = io.StringIO("# Title\n")
+        self.assertEqual(read_front_matter(file), ({}, 0))
+        self.assertEqual(file.readline(), "# Title\n")
+
+    def test_read_stops_after_header(self):
+        file = io.StringIO(TOML_PAGE)
+        metadata, lines = read_front_matter(file)
+        self.assertEqual((metadata["title"], lines), ("Minas Tirith", 5))
+        self.assertEqual(file.read(), "\n# Heading\n")
+
+    def test_errors_have_line_numbers(self):
+        with self.assertRaises(MarkdownError) as raised:
+            split_front_matter("---\ntitle: x\nnot a pair\n---\n")
+        self.assertEqual(raised.exception.line, 3)
+        with self.assertRaises(MarkdownError):
+            read_front_matter(io.StringIO("+++\ntitle = 'x'\n"))
+
+    def test_template_variables(self):
+        self.assertEqual(template_variables({"tags": ["a", "b"], "draft": True, "n": 2}), {"tags": "a, b", "draft": "true", "n": "2"})
+
+
+class TestPages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        use_block_cache(0)
+
+    def test_scan_reads_only_the_header(self):
+        # the body is not valid utf-8, so decoding it would fail
+        path = self.write(os.path.join("content", "post", "index.md"), YAML_PAGE.encode("utf-8") + b"x" * 100000 + b"\xff\xfe")
+        self.assertEqual(scan_metadata(path)["tags"], ["horses", "rohan, west"])
+        untitled = self.write(os.path.join("content", "index.md"), "intro\n# From Heading\n" + "\xff" * 10)
+        self.assertEqual(scan_metadata(untitled), {"title": "From Heading"})
+        self.assertEqual(set(scan_pages(os.path.join(self.tmp.name, "content"))), {path, untitled})
+
+    def test_generate_page_uses_front_matter(self):
+        source = self.write("index.md", YAML_PAGE)
+        template = self.write("template.html", "<title>{{ Title }}</title><meta name='tags' content='{{ tags }}'>{{ author }}{{ Content }}")
+        generate_page(source, template, os.path.join(self.tmp.name, "out"), {"author": "anonymous", "tags": "none"})
+        with open(os.path.join(self.tmp.name, "out", "index.html")) as file:
+            self.assertEqual(file.read(), "<title>Riders of Rohan</title><meta name='tags' content='horses, rohan, west'>anonymous<div><h1>Heading</h1><p>Body text.</p></div>")
+
+    def test_titles_and_values_are_escaped(self):
+        source = self.write("index.md", '---\nauthor: "Tom & <Jerry>"\n---\n# Fish & "Chips" <b>\n')
+        template = self.write("template.html", '<title>{{ Title }}</title><meta content="{{ author }}"><meta content="{{ note }}">')
+        expected = '<title>Fish &amp; "Chips" &lt;b&gt;</title><meta content="Tom &amp; &lt;Jerry&gt;"><meta content="&quot;quoted&quot;">'
+        generate_page(source, template, os.path.join(self.tmp.name, "out"), {"note": '"quoted"'})
+        with open(os.path.join(self.tmp.name, "out", "index.html")) as file:
+            self.assertEqual(file.read(), expected)
+        self.assertEqual(render_page(source, template, {"note": '"quoted"'}), expected)
+
+    def test_body_errors_count_front_matter_lines(self):
+        source = self.write("index.md", TOML_PAGE + "\nbroken **bold\n")
+        template = self.write("template.html", "{{ Content }}")
+        with self.assertRaises(MarkdownError) as raised:
+            generate_page(source, template, os.path.join(self.tmp.name, "out"))
+        self.assertEqual(raised.exception.line, 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
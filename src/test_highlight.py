@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+import highlight
+from highlight import highlight as highlight_text, highlight_code, language_name, use_highlight_cache
+
+
+class TestHighlight(unittest.TestCase):
+    def tearDown(self):
+        highlight.highlight_cache = None
+
+    def test_language_name(self):
+        self.assertEqual(language_name("py"), "python")
+        self.assertEqual(language_name(" Bash  title=x"), "shell")
+        self.assertEqual(language_name(""), "")
+        self.assertEqual(language_name('c"onclick'), "conclick")
+
+    def test_tokens(self):
+        self.assertEqual(
+            highlight_text('def f(): return "<a>" # done & dusted', "python"),
+            '<span class="hl-keyword">def</span> f(): <span class="hl-keyword">return</span> '
+            '<span class="hl-string">"&lt;a&gt;"</span> <span class="hl-comment"># done &amp; dusted</span>',
+        )
+        # keywords inside identifiers, strings and comments are left alone
+        self.assertEqual(highlight_text("format = 'if' // for", "javascript"), 'format = <span class="hl-string">\'if\'</span> <span class="hl-comment">// for</span>')
+        self.assertEqual(highlight_text('echo "$HOME" $USER', "shell"), 'echo <span class="hl-string">"$HOME"</span> <span class="hl-variable">$USER</span>')
+        self.assertEqual(highlight_text('{"a": [1, true]}', "json"), '{<span class="hl-string">"a"</span>: [<span class="hl-number">1</span>, <span class="hl-literal">true</span>]}')
+
+    def test_unknown_language_is_escaped(self):
+        self.assertEqual(highlight_text("if a < b && c", "cobol"), "if a &lt; b &amp;&amp; c")
+        self.assertEqual(highlight_code("if a < b", ""), "if a &lt; b")
+
+    def test_cache_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "highlight.json")
+            cache = use_highlight_cache(path)
+            self.assertEqual(highlight_code("x = 1", "python"), 'x = <span class="hl-number">1</span>')
+            self.assertEqual(highlight_code("x = 1", "python"), 'x = <span class="hl-number">1</span>')
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            # the same code in another language is a different entry
+            highlight_code("x = 1", "go")
+            self.assertEqual(len(cache.entries), 2)
+            cache.save(path)
+
+            cache = use_highlight_cache(path)
+            highlight_code("x = 1", "python")
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+            self.assertEqual(cache.new_entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
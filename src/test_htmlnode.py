@@ -1,6 +1,8 @@
+import io
 import unittest
 from htmlnode import *
 from textnode import *
+from blockcache import BlockCache
 
 
 class TestInlineMarkdown(unittest.TestCase):
@@ -149,6 +151,157 @@ class TestInlineMarkdown(unittest.TestCase):
             ],
             new_nodes,
         )
+    def test_text_to_textnodes(self):
+        nodes = text_to_textnodes(
+            "This is **text** with an *italic* word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)"
+        )
+        self.assertListEqual(
+            [
+                TextNode("This is ", TextType.TEXT),
+                TextNode("text", TextType.BOLD),
+                TextNode(" with an ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word and a ", TextType.TEXT),
+                TextNode("code block", TextType.CODE),
+                TextNode(" and an ", TextType.TEXT),
+                TextNode("obi wan image", TextType.IMAGE, "https://i.imgur.com/fJRm4Vk.jpeg"),
+                TextNode(" and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://boot.dev"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_code_keeps_delimiters(self):
+        self.assertListEqual(
+            [TextNode("a * b ** c", TextType.CODE)],
+            text_to_textnodes("`a * b ** c`"),
+        )
+
+    def test_text_to_textnodes_nested_emphasis(self):
+        nodes = text_to_textnodes("**bold *italic* bold** and *it **b** it*")
+        self.assertListEqual(
+            [
+                TextNode("bold italic bold", TextType.BOLD, children=[
+                    TextNode("bold ", TextType.TEXT),
+                    TextNode("italic", TextType.ITALIC),
+                    TextNode(" bold", TextType.TEXT),
+                ]),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("it b it", TextType.ITALIC, children=[
+                    TextNode("it ", TextType.TEXT),
+                    TextNode("b", TextType.BOLD),
+                    TextNode(" it", TextType.TEXT),
+                ]),
+            ],
+            nodes,
+        )
+        html = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        self.assertEqual(html, "<b>bold <i>italic</i> bold</b> and <i>it <b>b</b> it</i>")
+
+    def test_text_to_textnodes_triple_star(self):
+        nodes = text_to_textnodes("***both***")
+        html = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        self.assertEqual(html, "<b><i>both</i></b>")
+
+    def test_text_to_textnodes_literal_star_in_bold(self):
+        for text, expected in (
+            ("**a*b**", "<b>a*b</b>"),
+            ("x **a * b** y", "x <b>a * b</b> y"),
+            ("**a *b***", "<b>a <i>b</i></b>"),
+        ):
+            nodes = text_to_textnodes(text)
+            self.assertEqual("".join(text_node_to_html_node(node).to_html() for node in nodes), expected)
+
+    def test_text_to_textnodes_unclosed(self):
+        for text in ("an **unclosed bold", "an *unclosed italic", "an `unclosed code"):
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
+    def test_text_to_textnodes_literal_brackets(self):
+        self.assertListEqual(
+            [TextNode("wow! [not a link] (really)", TextType.TEXT)],
+            text_to_textnodes("wow! [not a link] (really)"),
+        )
+class TestHTMLSerializer(unittest.TestCase):
+    def test_parent_to_html(self):
+        node = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text "), LeafNode("a", "link", {"href": "/x", "target": "_blank"})])
+        self.assertEqual(node.to_html(), '<p><b>Bold</b> text <a href="/x" target="_blank">link</a></p>')
+
+    def test_iter_html_chunks(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "hi")])])
+        self.assertListEqual(list(node.iter_html()), ["<div>", "<p>", "hi", "</p>", "</div>"])
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(len(html), 5000 * len("<span></span>") + len("deep"))
+
+    def test_write_html_matches_to_html(self):
+        node = markdown_to_html_node("# Title\n\n" + "\n\n".join(f"para **{i}**" for i in range(2000)))
+        file = io.StringIO()
+        write_html(node, file, buffer_size=100)
+        self.assertEqual(file.getvalue(), node.to_html())
+
+    def test_escaping(self):
+        node = ParentNode("p", [LeafNode(None, "a < b & c > d"), LeafNode("a", 'say "hi"', {"href": '/x?a=1&b="2"'})])
+        self.assertEqual(node.to_html(), '<p>a &lt; b &amp; c &gt; d<a href="/x?a=1&amp;b=&quot;2&quot;">say "hi"</a></p>')
+        self.assertEqual(LeafNode(None, "<b>x</b>", safe=True).to_html(), "<b>x</b>")
+        self.assertEqual(LeafNode("img", "", {"src": "/a.png", "width": 100}).to_html(), '<img src="/a.png" width="100"></img>')
+        self.assertEqual(LeafNode("img", "", {"width": 100}, safe=True).to_html(), '<img width="100"></img>')
+        self.assertEqual(markdown_to_html_node("1 < 2 **&** `<br>`").to_html(), "<div><p>1 &lt; 2 <b>&amp;</b> <code>&lt;br&gt;</code></p></div>")
+
+    def test_escaped_value_is_cached(self):
+        leaf = LeafNode("b", "fish & chips")
+        self.assertIsNone(leaf.escaped)
+        self.assertEqual(leaf.to_html(), "<b>fish &amp; chips</b>")
+        self.assertEqual(leaf.escaped, "fish &amp; chips")
+        plain = LeafNode(None, "nothing to escape")
+        self.assertEqual(plain.to_html(), "nothing to escape")
+        self.assertIsNone(plain.escaped)
+
+    def test_parsed_text_is_escaped_per_block(self):
+        node = markdown_to_html_node('a & [link](/x?a=1&b="2") ![alt "q"](/i.png)')
+        leaves = node.children[0].children
+        self.assertTrue(all(leaf.safe for leaf in leaves))
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>a &amp; <a href="/x?a=1&amp;b=&quot;2&quot;">link</a> <img src="/i.png" alt="alt &quot;q&quot;"></img></p></div>',
+        )
+
+    def test_cached_blocks_are_not_escaped_again(self):
+        cache = BlockCache()
+        markdown = "a & b\n\n```\n<tag>\n```"
+        first = markdown_to_html_node(markdown, cache).to_html()
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), first)
+        self.assertEqual("".join(iter_markdown_html(markdown, cache)), first)
+        self.assertEqual(first, "<div><p>a &amp; b</p><pre><code>\n&lt;tag&gt;\n</code></pre></div>")
+
+    def test_props_are_frozen(self):
+        leaf = LeafNode("a", "link", {"href": "/x"})
+        self.assertEqual(leaf.props, (("href", "/x"),))
+        self.assertIs(LeafNode("b", "bold").props, EMPTY_PROPS)
+        self.assertIs(ParentNode("p", [], {}).props, EMPTY_PROPS)
+        self.assertFalse(hasattr(leaf, "__dict__"))
+
+    def test_text_node_to_html_node(self):
+        self.assertEqual(text_node_to_html_node(TextNode("x", TextType.CODE)).to_html(), "<code>x</code>")
+        self.assertEqual(
+            text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/i.png")).to_html(),
+            '<img src="/i.png" alt="alt"></img>',
+        )
+        with self.assertRaises(Exception):
+            text_node_to_html_node(TextNode("x", "unknown"))
+
+    def test_invalid_nodes_raise(self):
+        with self.assertRaises(ValueError):
+            ParentNode(None, [LeafNode(None, "x")]).to_html()
+        with self.assertRaises(ValueError):
+            list(ParentNode("div", [ParentNode("p", None)]).iter_html())
+        with self.assertRaises(ValueError):
+            ParentNode("div", [LeafNode("b", None)]).to_html()
 
 class TestMarkdownToHTML(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -171,6 +324,63 @@ This is the same paragraph on a new line
             ],
         )
 
+    def test_blank_lines_inside_fences_stay_in_block(self):
+        md = "intro\n\n```\nfirst\n\n   \nsecond\n```\n\nafter"
+        self.assertEqual(markdown_to_blocks(md), ["intro", "```\nfirst\n\n   \nsecond\n```", "after"])
+        self.assertEqual(markdown_to_blocks("```inline```\n\nnext"), ["```inline```", "next"])
+
+    def test_iter_blocks_line_numbers(self):
+        md = "\n# Title\r\n\r\nline one\nline two\n\n\n\n* item\n"
+        self.assertEqual(list(iter_blocks(md)), [(2, "# Title"), (4, "line one\nline two"), (9, "* item")])
+
+    def test_iter_blocks_reads_file_lazily(self):
+        source = io.StringIO("a\n\nb\n\nc\n")
+        blocks = iter_blocks(source)
+        self.assertEqual(next(blocks), (1, "a"))
+        self.assertEqual(source.readline(), "b\n")
+        self.assertEqual(markdown_to_html_node(io.StringIO("# Hi\n\nthere\n")).to_html(), "<div><h1>Hi</h1><p>there</p></div>")
+
+    def test_errors_report_line_number(self):
+        with self.assertRaises(MarkdownError) as raised:
+            markdown_to_html_node("# Title\n\nfine\n\nbroken **bold")
+        self.assertEqual(raised.exception.line, 5)
+        self.assertTrue(str(raised.exception).startswith("line 5: "))
+
+    def test_iter_markdown_html_matches_tree(self):
+        md = "# Title\n\npara *one*\n\n```\ncode\n\nmore\n```\n\n> quote\n\npara *one*\n"
+        expected = markdown_to_html_node(md).to_html()
+        self.assertEqual("".join(iter_markdown_html(io.StringIO(md))), expected)
+        cache = BlockCache()
+        self.assertEqual("".join(iter_markdown_html(md, cache)), expected)
+        self.assertEqual(cache.hits, 1)
+
+    def test_registered_block_type(self):
+        def admonition_node(text):
+            kind, _, body = text[4:].partition("\n")
+            return ParentNode("aside", t2c(body), {"class": kind.strip()})
+
+        register_block_type("admonition", admonition_node, lambda text: text.startswith("!!! "), "!")
+        try:
+            self.assertEqual(block_to_block_type("!!! note\nMind the *gap*"), "admonition")
+            self.assertEqual(block_to_block_type("![image](/x.png)"), "paragraph")
+            self.assertEqual(
+                markdown_to_html_node("!!! note\nMind the *gap*").to_html(),
+                '<div><aside class="note">Mind the <i>gap</i></aside></div>',
+            )
+            self.assertEqual(BLOCK_DISPATCH["#"], (BLOCK_TYPES["heading"],))
+        finally:
+            unregister_block_type("admonition")
+        self.assertNotIn("!", BLOCK_DISPATCH)
+        self.assertEqual(block_to_block_type("!!! note\ntext"), "paragraph")
+
+    def test_later_registration_takes_precedence(self):
+        register_block_type("shout", lambda text: LeafNode("strong", text[2:]), lambda text: text.startswith("#!"), "#")
+        try:
+            self.assertEqual(block_to_block_type("#! loud"), "shout")
+            self.assertEqual(block_to_block_type("# heading"), "heading")
+        finally:
+            unregister_block_type("shout")
+
     def test_markdown_to_blocks_newlines(self):
         md = """
 This is **bolded** paragraph
@@ -290,5 +500,65 @@ this is paragraph text
             html,
             "<div><blockquote>This is a blockquote block</blockquote><p>this is paragraph text</p></div>",
         )
+
+    def test_code_block_is_not_inline_markdown(self):
+        node = markdown_to_html_node("```\nx = a * b * c  # `tick` <b> & [a](b)\n```")
+        self.assertEqual(node.to_html(), "<div><pre><code>\nx = a * b * c  # `tick` &lt;b&gt; &amp; [a](b)\n</code></pre></div>")
+
+    def test_code_block_language(self):
+        node = markdown_to_html_node("```Python extra words\nreturn None\n```")
+        self.assertEqual(
+            node.to_html(),
+            '<div><pre><code class="language-python">\n<span class="hl-keyword">return</span> <span class="hl-literal">None</span>\n</code></pre></div>',
+        )
+        node = markdown_to_html_node('```"><script>\nx\n```')
+        self.assertEqual(node.to_html(), '<div><pre><code class="language-script">\nx\n</code></pre></div>')
+
+    def test_block_to_block_types_mixed_lines(self):
+        self.assertEqual(block_to_block_type("###### h6"), "heading")
+        self.assertEqual(block_to_block_type("####### too deep"), "paragraph")
+        self.assertEqual(block_to_block_type("- dash\n- list"), "unordered_list")
+        self.assertEqual(block_to_block_type("* star\n- dash"), "paragraph")
+        self.assertEqual(block_to_block_type("1. one\n3. three"), "paragraph")
+        self.assertEqual(block_to_block_type("> quote\nplain"), "paragraph")
+        self.assertEqual(block_to_block_type(""), "paragraph")
+
+    def test_all_block_types_regression(self):
+        # output captured before the single-pass block pipeline; it must not change
+        md = """# Title with **bold**
+
+Paragraph with *italic*, `code`, a [link](/x) and ![img](/i.png)
+continued on a second line
+
+## Second heading
+
+> quoted *text*
+> more
+
+* star item
+* another **item**
+
+- dash item
+- dash two
+
+1. first
+2. second
+3. third
+
+1. not
+3. ordered
+
+```
+code here
+```
+
+#### h4 heading
+
+>not all
+quote"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><h1>Title with <b>bold</b></h1><p>Paragraph with <i>italic</i>, <code>code</code>, a <a href="/x">link</a> and <img src="/i.png" alt="img"></img> continued on a second line</p><h2>Second heading</h2><blockquote>quoted <i>text</i> more</blockquote><ul><li>star item</li><li>another <b>item</b></li></ul><ul><li>dash item</li><li>dash two</li></ul><ol><li>first</li><li>second</li><li>third</li></ol><p>1. not 3. ordered</p><pre><code>\ncode here\n</code></pre><h4>h4 heading</h4><p>&gt;not all quote</p></div>',
+        )
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,14 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
-from main import extract_title
+from bulkio import BulkIO
+from fixtures import TempDirTestCase
+from htmlnode import MarkdownError
+from main import extract_title, sync_contents, collect_page_jobs, generate_pages_recursive, build_parser, main, use_block_cache
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -29,6 +38,187 @@ class TestExtractTitle(unittest.TestCase):
         markdown = "Some content\n# Title in the middle\nMore content"
         result = extract_title(markdown)
         self.assertEqual(result, "Title in the middle")
+    def test_stops_at_first_header_in_file(self):
+        source = io.StringIO("intro\n# File title \r\nbody\n")
+        self.assertEqual(extract_title(source), "File title")
+        self.assertEqual(source.readline(), "body\n")
+        with self.assertRaises(Exception):
+            extract_title(io.StringIO("no title\n"))
+
+class TestSyncContents(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.static, "images"))
+        os.makedirs(self.public)
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "tolkien.png"), "png")
+        self.write(os.path.join(self.public, "index.html"), "<p>page</p>")
+
+    def test_initial_sync_copies_everything(self):
+        synced, copied, removed = sync_contents(self.static, self.public)
+        self.assertEqual(synced, ["images/tolkien.png", "index.css"])
+        self.assertEqual((copied, removed), (2, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "images", "tolkien.png")))
+
+    def test_noop_sync_touches_nothing(self):
+        synced, _, _ = sync_contents(self.static, self.public)
+        css = os.path.join(self.public, "index.css")
+        before = os.stat(css).st_mtime_ns
+        _, copied, removed = sync_contents(self.static, self.public, synced)
+        self.assertEqual((copied, removed), (0, 0))
+        self.assertEqual(before, os.stat(css).st_mtime_ns)
+
+    def test_changed_file_is_copied(self):
+        synced, _, _ = sync_contents(self.static, self.public)
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        _, copied, _ = sync_contents(self.static, self.public, synced)
+        self.assertEqual(copied, 1)
+        with open(os.path.join(self.public, "index.css")) as file:
+            self.assertEqual(file.read(), "body { color: red }")
+
+    def test_bulk_io_sync(self):
+        with BulkIO(2) as io:
+            synced, copied, _ = sync_contents(self.static, self.public, io=io)
+        self.assertEqual(copied, 2)
+        with open(os.path.join(self.public, "images", "tolkien.png")) as file:
+            self.assertEqual(file.read(), "png")
+
+    def test_checksum_skips_touched_but_identical_file(self):
+        synced, _, _ = sync_contents(self.static, self.public)
+        os.utime(os.path.join(self.static, "index.css"), ns=(0, 0))
+        _, copied, _ = sync_contents(self.static, self.public, synced, checksum=True)
+        self.assertEqual(copied, 0)
+        _, copied, _ = sync_contents(self.static, self.public, synced)
+        self.assertEqual(copied, 1)
+
+    def test_removed_file_is_deleted_and_pages_kept(self):
+        synced, _, _ = sync_contents(self.static, self.public)
+        os.remove(os.path.join(self.static, "images", "tolkien.png"))
+        synced, _, removed = sync_contents(self.static, self.public, synced)
+        self.assertEqual(removed, 1)
+        self.assertEqual(synced, ["index.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+class TestParallelGeneration(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(6):
+            directory = os.path.join(self.content, *[f"section{j}" for j in range(i)])
+            self.write(os.path.join(directory, "index.md"), f"# Page {i}\n\nSome **bold** text and a [link](/page{i})\n\n* one\n* two")
+
+    def read_tree(self, directory):
+        pages = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, "rb") as file:
+                    pages[os.path.relpath(path, directory)] = file.read()
+        return pages
+
+    def test_collect_page_jobs(self):
+        jobs = collect_page_jobs(self.content, "public")
+        self.assertEqual(len(jobs), 6)
+        self.assertIn((os.path.join(self.content, "section0", "index.md"), os.path.join("public", "section0")), jobs)
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        self.assertEqual(generate_pages_recursive(self.content, self.template, serial, workers=1), [])
+        self.assertEqual(generate_pages_recursive(self.content, self.template, parallel, workers=3), [])
+        self.assertEqual(len(self.read_tree(serial)), 6)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_bulk_io_output_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        threaded = os.path.join(self.tmp.name, "threaded")
+        self.assertEqual(generate_pages_recursive(self.content, self.template, serial, workers=1), [])
+        with BulkIO(4) as io:
+            self.assertEqual(generate_pages_recursive(self.content, self.template, threaded, workers=1, io=io), [])
+        self.assertEqual(self.read_tree(serial), self.read_tree(threaded))
+
+    def test_errors_are_reported_per_page(self):
+        broken = os.path.join(self.content, "section0", "index.md")
+        with open(broken, "w") as file:
+            file.write("no title here")
+        for workers in (1, 3):
+            failures = generate_pages_recursive(self.content, self.template, os.path.join(self.tmp.name, "out"), workers=workers)
+            self.assertEqual([source for source, _ in failures], [broken])
+            self.assertEqual(str(failures[0][1]), "No header found")
+
+    def test_markdown_errors_keep_their_line_in_workers(self):
+        broken = os.path.join(self.content, "section0", "section1", "index.md")
+        with open(broken, "w") as file:
+            file.write("# Broken\n\nan **unclosed bold")
+        failures = generate_pages_recursive(self.content, self.template, os.path.join(self.tmp.name, "out"), workers=2)
+        self.assertEqual([source for source, _ in failures], [broken])
+        self.assertIsInstance(failures[0][1], MarkdownError)
+        self.assertEqual(failures[0][1].line, 3)
+        self.assertTrue(str(failures[0][1]).startswith("line 3: "))
+
+class TestCommandLine(unittest.TestCase):
+    def test_import_has_no_side_effects(self):
+        src = os.path.dirname(os.path.abspath(__file__))
+        with tempfile.TemporaryDirectory() as directory:
+            result = subprocess.run(
+                [sys.executable, "-c", "import main, htmlnode, textnode, template, manifest"],
+                cwd=directory, env={**os.environ, "PYTHONPATH": src}, capture_output=True, text=True,
+            )
+            self.assertEqual((result.returncode, result.stdout, result.stderr), (0, "", ""))
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_import_leaves_heavy_modules_unloaded(self):
+        src = os.path.dirname(os.path.abspath(__file__))
+        heavy = ["argparse", "asyncio", "concurrent.futures", "http.server", "multiprocessing", "xml.sax.saxutils"]
+        result = subprocess.run(
+            [sys.executable, "-c", f"import sys, main; print([name for name in {heavy!r} if name in sys.modules])"],
+            env={**os.environ, "PYTHONPATH": src}, capture_output=True, text=True,
+        )
+        self.assertEqual((result.returncode, result.stdout.strip()), (0, "[]"))
+
+    def test_parser_defaults(self):
+        args = build_parser().parse_args(["build"])
+        self.assertEqual((args.content, args.static, args.template, args.out), ("content", "static", "template.html", "public"))
+        self.assertFalse(args.full)
+        self.assertIsNone(args.site_url)
+        args = build_parser().parse_args(["serve", "--port", "9000", "--out", "site"])
+        self.assertEqual((args.port, args.out), (9000, "site"))
+
+    def test_build_and_clean(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            static = os.path.join(directory, "static")
+            out = os.path.join(directory, "out")
+            template = os.path.join(directory, "template.html")
+            os.makedirs(content)
+            os.makedirs(static)
+            with open(os.path.join(content, "index.md"), "w") as file:
+                file.write("# Home")
+            with open(template, "w") as file:
+                file.write("{{ Title }} {{ site }}")
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                # assertLogs swaps in its own root handler and restores the root logger
+                # afterwards, so main() leaves no handler or level behind for later tests
+                with contextlib.redirect_stdout(io.StringIO()), self.assertLogs(level="INFO") as logs:
+                    main(["--content", content, "--static", static, "--template", template, "--out", out, "-j", "1", "--var", "site=Tolkien"])
+                self.assertIn("WARNING:main:No --site-url given: sitemap.xml and feed.xml were not written", logs.output)
+                with open(os.path.join(out, "index.html")) as file:
+                    self.assertEqual(file.read(), "Home Tolkien")
+                self.assertTrue(os.path.exists(os.path.join(directory, ".build", "manifest.json")))
+                with contextlib.redirect_stdout(io.StringIO()), self.assertLogs(level="INFO") as logs:
+                    main(["clean", "--out", out])
+                self.assertIn(f"INFO:main:Removed {out}", logs.output)
+                self.assertEqual(sorted(os.listdir(directory)), ["content", "static", "template.html"])
+            finally:
+                os.chdir(cwd)
+                use_block_cache(0)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from manifest import BuildManifest, hash_file
+from main import generate_pages_recursive
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, ".build", "manifest.json")
+        os.makedirs(os.path.join(self.content, "post"))
+        os.makedirs(self.public)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nworld")
+
+    def build(self):
+        manifest = BuildManifest(self.manifest_path).load()
+        generate_pages_recursive(self.content, self.template, self.public, manifest)
+        manifest.save(self.public)
+        return manifest
+
+    def mtimes(self):
+        return {
+            path: os.stat(path).st_mtime_ns
+            for path in (os.path.join(self.public, "index.html"), os.path.join(self.public, "post", "index.html"))
+        }
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        before = self.mtimes()
+        manifest = self.build()
+        self.assertEqual(before, self.mtimes())
+        self.assertEqual(len(manifest.pages), 2)
+
+    def test_changed_page_rebuilds_only_that_page(self):
+        self.build()
+        before = self.mtimes()
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\nchanged")
+        self.build()
+        after = self.mtimes()
+        home, post = list(before)
+        self.assertEqual(before[home], after[home])
+        self.assertNotEqual(before[post], after[post])
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        manifest = self.build()
+        with open(os.path.join(self.public, "post", "index.html")) as file:
+            self.assertEqual(file.read(), "<h1>Post</h1><div><h1>Post</h1><p>world</p></div>")
+        for entry in manifest.pages.values():
+            self.assertEqual(entry["template_hash"], hash_file(self.template))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_deleted_source_is_dropped(self):
+        self.build()
+        os.remove(os.path.join(self.content, "post", "index.md"))
+        self.write(os.path.join(self.public, "post", "index.html.gz"), "stale")
+        manifest = self.build()
+        self.assertEqual(list(manifest.pages), [os.path.join(self.content, "index.md")])
+        # its output goes too, with the compressed sibling and the emptied directory
+        self.assertEqual(os.listdir(self.public), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import gzip
+import json
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from postprocess import ASSET_MANIFEST, COMPRESSED_SUFFIXES, compress_outputs, fingerprinted_name, postprocess, rewrite_references
+
+
+class TestRewriteReferences(unittest.TestCase):
+    def test_absolute_relative_and_old_names(self):
+        mapping = {"index.css": "index.0123abcd.css", "images/ring.png": "images/ring.89abcdef.png"}
+        html = '<link href="/index.css" rel="stylesheet"><img src="../images/ring.png?v=1" alt="x"><a href="https://cdn.example/index.css">'
+        self.assertEqual(
+            rewrite_references(html, "blog", mapping),
+            '<link href="/index.0123abcd.css" rel="stylesheet"><img src="../images/ring.89abcdef.png?v=1" alt="x"><a href="https://cdn.example/index.css">',
+        )
+        # a page still pointing at an older fingerprint is moved to the current one
+        self.assertEqual(rewrite_references('<link href="/index.ffffffff.css">', "", mapping), '<link href="/index.0123abcd.css">')
+        self.assertEqual(rewrite_references('<a href="/about">', "", mapping), '<a href="/about">')
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(fingerprinted_name("css/site.css", "0123456789"), "css/site.01234567.css")
+
+
+class TestPostprocess(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public = self.tmp.name
+        self.write("index.css", "body { color: black }")
+        self.write("index.html", '<link href="/index.css" rel="stylesheet"><p>' + "text " * 100 + "</p>")
+
+    def read(self, name):
+        with open(os.path.join(self.public, name)) as file:
+            return file.read()
+
+    def test_fingerprint_rewrite_and_undo(self):
+        stats = postprocess(self.public, ["index.css"], fingerprint=True, compress=False)
+        self.assertEqual((stats["fingerprinted"], stats["rewritten"]), (1, 1))
+        mapping = json.loads(self.read(ASSET_MANIFEST))
+        self.assertIn(f'href="/{mapping["index.css"]}"', self.read("index.html"))
+        self.assertEqual(self.read(mapping["index.css"]), "body { color: black }")
+
+        # a changed asset gets a new name and the old copy is removed
+        self.write("index.css", "body { color: red }")
+        postprocess(self.public, ["index.css"], fingerprint=True, compress=False)
+        new_name = json.loads(self.read(ASSET_MANIFEST))["index.css"]
+        self.assertNotEqual(new_name, mapping["index.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.public, mapping["index.css"])))
+        self.assertIn(f'href="/{new_name}"', self.read("index.html"))
+
+        postprocess(self.public, ["index.css"], fingerprint=False, compress=False)
+        self.assertIn('href="/index.css"', self.read("index.html"))
+        self.assertEqual(sorted(os.listdir(self.public)), ["index.css", "index.html"])
+
+    def test_compression_skips_unchanged_files(self):
+        written, siblings = compress_outputs(self.public, workers=2)
+        self.assertEqual(siblings, sorted(name + suffix for name in ("index.css", "index.html") for suffix in COMPRESSED_SUFFIXES))
+        self.assertEqual(written, len(siblings))
+        with gzip.open(os.path.join(self.public, "index.html.gz"), "rt") as file:
+            self.assertEqual(file.read(), self.read("index.html"))
+        self.assertEqual(compress_outputs(self.public, previous=siblings)[0], 0)
+        self.write("index.css", "body {}")
+        self.assertEqual(compress_outputs(self.public, previous=siblings)[0], len(COMPRESSED_SUFFIXES))
+        os.remove(os.path.join(self.public, "index.css"))
+        _, siblings = compress_outputs(self.public, previous=siblings)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css.gz")))
+        compress_outputs(self.public, compress=False, previous=siblings)
+        self.assertEqual(os.listdir(self.public), ["index.html"])
+
+    def test_static_files_with_compressed_suffixes_are_left_alone(self):
+        self.write("data.tar.gz", "archive")
+        self.write("notes.txt", "notes")
+        self.write("notes.txt.gz", "hand made")
+        assets = ["data.tar.gz", "index.css", "notes.txt", "notes.txt.gz"]
+        siblings = []
+        for compress in (True, True, False):
+            siblings = postprocess(self.public, assets, fingerprint=False, compress=compress, compressed=siblings)["siblings"]
+            self.assertEqual(self.read("data.tar.gz"), "archive")
+            self.assertEqual(self.read("notes.txt.gz"), "hand made")
+        self.assertEqual(siblings, [])
+        self.assertEqual(sorted(os.listdir(self.public)), ["data.tar.gz", "index.css", "index.html", "notes.txt", "notes.txt.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
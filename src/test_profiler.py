@@ -0,0 +1,76 @@
+import json
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+import htmlnode
+import profiler
+from main import generate_pages_recursive, use_block_cache
+
+STAGES = {"walk", "read", "markdown_to_blocks", "block typing", "inline parsing", "to_html", "templating", "write", "page"}
+
+
+class TestProfiler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        # cached blocks would skip the parsing stages
+        use_block_cache(0)
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nshort")
+        self.write(os.path.join(self.content, "post", "index.md"), "# Post\n\n" + "* item **x**\n" * 200)
+
+    def tearDown(self):
+        profiler.disable()
+
+    def build(self, workers):
+        profile = profiler.enable()
+        failures = generate_pages_recursive(self.content, self.template, os.path.join(self.tmp.name, "public"), workers=workers)
+        self.assertEqual(failures, [])
+        return profile
+
+    def test_stages_are_recorded(self):
+        profile = self.build(workers=1)
+        self.assertEqual(set(profile.totals), STAGES)
+        self.assertEqual(profile.totals["page"][0], 2)
+        self.assertEqual(profile.totals["markdown_to_blocks"][0], 2)
+        post = os.path.join(self.content, "post", "index.md")
+        self.assertEqual(profile.slowest_pages(1)[0][1], post)
+        self.assertIn(post, profile.report())
+
+    def test_block_cache_serialization_is_timed_as_to_html(self):
+        use_block_cache(1024 * 1024)
+        self.addCleanup(use_block_cache, 0)
+        profile = self.build(workers=1)
+        # every block is serialized as it is cached, and each page's div once more when
+        # it is written
+        self.assertGreater(profile.totals["to_html"][0], 2)
+
+    def test_worker_profiles_are_merged(self):
+        profile = self.build(workers=2)
+        self.assertEqual(profile.totals["page"][0], 2)
+        self.assertEqual(set(profile.pages), {os.path.join(self.content, "index.md"), os.path.join(self.content, "post", "index.md")})
+
+    def test_trace_events(self):
+        profile = self.build(workers=1)
+        path = os.path.join(self.tmp.name, "trace.json")
+        profile.write_trace(path)
+        with open(path) as file:
+            events = json.load(file)["traceEvents"]
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+        self.assertEqual({event["name"] for event in events}, STAGES)
+
+    def test_disable_restores_functions(self):
+        original = htmlnode.text_to_textnodes
+        profiler.enable()
+        self.assertIsNot(htmlnode.text_to_textnodes, original)
+        profiler.disable()
+        self.assertIs(htmlnode.text_to_textnodes, original)
+        self.assertIsNone(profiler.active())
+        with profiler.stage("noop"):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from bulkio import BulkIO
+from depgraph import DependencyGraph
+from fixtures import TempDirTestCase
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from siteindex import SiteIndex, page_metadata, summarize
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_summary_and_words(self):
+        md = "# Title\n\nFirst *paragraph* with a [Link](https://example.com/skipped).\n\n```\nignored_code\n```\n\nSecond paragraph, first words."
+        metadata = page_metadata(md, "Title")
+        self.assertEqual(metadata["summary"], "First paragraph with a Link.")
+        self.assertEqual(metadata["words"], ["first", "link", "paragraph", "second", "title", "with", "words"])
+
+    def test_summarize(self):
+        self.assertEqual(summarize("one  two\nthree"), "one two three")
+        self.assertEqual(summarize("alpha beta gamma", 12), "alpha beta…")
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.state = os.path.join(self.tmp.name, ".build")
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home & Garden\n\nWelcome to the shire.")
+        self.write(os.path.join(self.content, "ring", "index.md"), "# The Ring\n\nOne ring to rule them all.")
+
+    def build(self, site_url="https://example.com/"):
+        manifest = BuildManifest(os.path.join(self.state, "manifest.json")).load()
+        graph = DependencyGraph(os.path.join(self.state, "depgraph.json")).load()
+        index = SiteIndex(os.path.join(self.state, "siteindex.json")).load()
+        self.assertEqual(generate_pages_recursive(self.content, self.template, self.public, manifest, graph=graph, site_index=index), [])
+        written = index.write(self.public, site_url)
+        manifest.save()
+        index.save()
+        return written
+
+    def read_json(self, name):
+        with open(os.path.join(self.public, name)) as file:
+            return json.load(file)
+
+    def test_outputs_follow_incremental_builds(self):
+        self.assertEqual(self.build(), 3)
+        search = self.read_json("search-index.json")
+        self.assertEqual([page[:2] for page in search["pages"]], [["/", "Home & Garden"], ["/ring/", "The Ring"]])
+        self.assertEqual(search["terms"]["ring"], [1])
+        self.assertEqual(search["terms"]["the"], [0, 1])
+        sitemap = ElementTree.parse(os.path.join(self.public, "sitemap.xml")).getroot()
+        locations = [element.text for element in sitemap.iter("{http://www.sitemaps.org/schemas/sitemap/0.9}loc")]
+        self.assertEqual(locations, ["https://example.com/", "https://example.com/ring/"])
+        feed = ElementTree.parse(os.path.join(self.public, "feed.xml")).getroot()
+        self.assertEqual(feed.find("channel/title").text, "Home & Garden")
+        self.assertEqual(len(feed.findall("channel/item")), 2)
+
+        # nothing changed, nothing written
+        self.assertEqual(self.build(), 0)
+
+        self.write(os.path.join(self.content, "ring", "index.md"), "# The Ring\n\nPrecious.")
+        self.write(os.path.join(self.content, "tower", "index.md"), "# Tower\n\nPrecious tower.")
+        self.assertEqual(self.build(), 3)
+        search = self.read_json("search-index.json")
+        self.assertEqual(search["terms"]["precious"], [1, 2])
+        self.assertNotIn("rule", search["terms"])
+
+        os.remove(os.path.join(self.content, "tower", "index.md"))
+        self.build()
+        self.assertEqual(len(self.read_json("search-index.json")["pages"]), 2)
+
+    def test_every_render_path_collects_metadata(self):
+        body = "# The Ring\n\n```\ncode words\n```\n\nOne [ring](/ring) to **rule** them all."
+        source = self.write(os.path.join(self.content, "ring", "index.md"), "---\ntitle: Precious\n---\n" + body)
+        expected = page_metadata(body, "Precious")
+        io = BulkIO(2)
+        self.addCleanup(io.close)
+        for number, options in enumerate(({}, {"workers": 2}, {"io": io})):
+            manifest = BuildManifest(os.path.join(self.state, f"manifest{number}.json"))
+            index = SiteIndex(os.path.join(self.state, f"siteindex{number}.json"))
+            self.assertEqual(generate_pages_recursive(self.content, self.template, self.public, manifest, site_index=index, **options), [])
+            self.assertEqual({key: index.pages[source][key] for key in expected}, expected)
+
+    def test_sitemap_and_feed_need_a_site_url(self):
+        self.assertEqual(self.build(None), 1)
+        self.assertEqual(sorted(name for name in os.listdir(self.public) if name.endswith((".xml", ".json"))), ["search-index.json"])
+        self.assertEqual(self.build(), 3)
+        # ones written with an earlier url are removed rather than left stale
+        self.assertEqual(self.build(None), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "sitemap.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "feed.xml")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import gzip
+import http.client
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+import unittest
+
+from fixtures import TempDirTestCase
+import staticserver
+from staticserver import FileCache, StaticServer, accepted_encodings
+
+
+class TestStaticServer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        self.write("index.html", "<h1>Home</h1>")
+        self.write(os.path.join("post", "index.html"), "<h1>Post</h1>" * 50)
+        self.write("index.0123abcd.css", "body {}")
+        self.write("large.bin", "x" * (staticserver.SENDFILE_THRESHOLD + 1))
+        path = os.path.join(self.root, "post", "index.html")
+        with open(path + ".gz", "wb") as file:
+            file.write(gzip.compress(b"<h1>Post</h1>" * 50))
+        stat = os.stat(path)
+        os.utime(path + ".gz", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.server = StaticServer(("localhost", 0), self.root, threads=4)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.connection = http.client.HTTPConnection("localhost", self.server.server_address[1], timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get(self, path, **headers):
+        self.connection.request("GET", path, headers=headers)
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_pages_and_keep_alive(self):
+        response, body = self.get("/")
+        self.assertEqual((response.status, body), (200, b"<h1>Home</h1>"))
+        self.assertEqual(response.getheader("Content-Type"), "text/html; charset=utf-8")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        response, _ = self.get("/post")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/post/"))
+        self.assertEqual(self.get("/missing")[0].status, 404)
+        self.assertEqual(self.get("/../etc/passwd")[0].status, 404)
+        self.get("/")
+        self.assertGreaterEqual(self.server.cache.hits, 1)
+
+    def test_idle_keep_alive_connections_do_not_hold_threads(self):
+        server = StaticServer(("localhost", 0), self.root, threads=2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        idle = [http.client.HTTPConnection("localhost", port, timeout=5) for _ in range(4)]
+        try:
+            for connection in idle:
+                connection.request("GET", "/")
+                connection.getresponse().read()
+            # the pool has two threads and four connections are open and idle
+            connection = http.client.HTTPConnection("localhost", port, timeout=2)
+            started = time.monotonic()
+            connection.request("GET", "/")
+            self.assertEqual(connection.getresponse().read(), b"<h1>Home</h1>")
+            self.assertLess(time.monotonic() - started, 1)
+            connection.close()
+            # the idle connections still work
+            for connection in idle:
+                connection.request("GET", "/")
+                self.assertEqual(connection.getresponse().status, 200)
+        finally:
+            for connection in idle:
+                connection.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_client_resets_are_not_server_errors(self):
+        errors = []
+        self.server.handle_error = lambda request, address: errors.append(address)
+        with self.assertLogs("staticserver", "DEBUG") as logs:
+            client = socket.create_connection(("localhost", self.server.server_address[1]))
+            # closing with a zero linger time resets the connection
+            client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            client.close()
+            deadline = time.monotonic() + 2
+            while not any("connection closed" in line for line in logs.output) and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertTrue(any("connection closed" in line for line in logs.output))
+        self.assertEqual(errors, [])
+
+    def test_conditional_requests(self):
+        response, _ = self.get("/index.0123abcd.css")
+        self.assertEqual(response.getheader("Cache-Control"), staticserver.IMMUTABLE_CACHE_CONTROL)
+        etag = response.getheader("ETag")
+        response, body = self.get("/index.0123abcd.css", **{"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+        response, _ = self.get("/index.0123abcd.css", **{"If-Modified-Since": response.getheader("Last-Modified")})
+        self.assertEqual(response.status, 304)
+        response, _ = self.get("/index.0123abcd.css", **{"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+        self.assertEqual(response.status, 200)
+
+    def test_gzip_sibling(self):
+        response, body = self.get("/post/", **{"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body), b"<h1>Post</h1>" * 50)
+        response, body = self.get("/post/", **{"Accept-Encoding": "gzip;q=0"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"<h1>Post</h1>" * 50)
+        # a sibling older than its source is ignored
+        self.write(os.path.join("post", "index.html"), "<h1>Edited</h1>")
+        self.assertEqual(self.get("/post/", **{"Accept-Encoding": "gzip"})[1], b"<h1>Edited</h1>")
+
+    def test_large_files_are_sent_without_caching(self):
+        response, body = self.get("/large.bin")
+        self.assertEqual(len(body), staticserver.SENDFILE_THRESHOLD + 1)
+        self.assertNotIn(os.path.join(self.server.root, "large.bin"), self.server.cache.entries)
+
+
+class TestFileCache(unittest.TestCase):
+    def test_eviction_and_invalidation(self):
+        with tempfile.TemporaryDirectory() as root:
+            paths = [os.path.join(root, f"{n}.txt") for n in range(3)]
+            for path in paths:
+                with open(path, "w") as file:
+                    file.write("x" * 10)
+            cache = FileCache(max_bytes=25)
+            for path in paths:
+                cache.get(path)
+            self.assertEqual(list(cache.entries), paths[1:])
+            with open(paths[2], "w") as file:
+                file.write("changed")
+            self.assertEqual(cache.get(paths[2]).body, b"changed")
+
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings("gzip, br;q=0, deflate;q=0.5"), {"gzip", "deflate"})
+        self.assertEqual(accepted_encodings(None), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
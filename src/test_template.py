@@ -0,0 +1,83 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template, clear_template_cache
+
+
+class TestTemplate(unittest.TestCase):
+    def test_segments(self):
+        template = Template("<title> {{ Title }} </title>{{Content}}!")
+        self.assertEqual(template.segments, [("<title> ", "Title"), (" </title>", "Content"), ("!", None)])
+        self.assertEqual(template.placeholders(), {"Title", "Content"})
+
+    def test_render_arbitrary_placeholders(self):
+        template = Template("<p>{{ date }} - {{ description }}</p><nav>{{ nav }}</nav>{{ missing }}")
+        html = template.render({"date": "2024-11-11", "description": "Tolkien", "nav": "<a href=\"/\">home</a>"})
+        self.assertEqual(html, '<p>2024-11-11 - Tolkien</p><nav><a href="/">home</a></nav>')
+
+    def test_values_are_not_rescanned(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render({"Title": "{{ Content }}", "Content": "{{ Title }}"}), "{{ Content }}|{{ Title }}")
+
+    def test_write_streams_nodes_and_chunks(self):
+        template = Template("<article>{{ Content }}</article>{{ footer }}")
+        node = ParentNode("div", [LeafNode("p", "hello")])
+        file = io.StringIO()
+        template.write(file, {"Content": node, "footer": iter(["<footer>", "bye", "</footer>"])})
+        self.assertEqual(file.getvalue(), "<article><div><p>hello</p></div></article><footer>bye</footer>")
+        self.assertEqual(template.render({"Content": node}), "<article><div><p>hello</p></div></article>")
+
+    def test_load_template_cache(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "template.html")
+            with open(path, "w") as file:
+                file.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+            with open(path, "w") as file:
+                file.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(0, 0))
+            second = load_template(path)
+            self.assertIsNot(first, second)
+            self.assertEqual(second.render({"Title": "x"}), "<h1>x</h1>")
+
+
+    def test_includes(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, "partials"))
+            with open(os.path.join(directory, "partials", "header.html"), "w") as file:
+                file.write("<header>{{ Title }}{{> nav.html }}</header>")
+            with open(os.path.join(directory, "partials", "nav.html"), "w") as file:
+                file.write("<nav>home</nav>")
+            path = os.path.join(directory, "template.html")
+            with open(path, "w") as file:
+                file.write("{{> partials/header.html }}<main>{{ Content }}</main>")
+            template = load_template(path)
+            self.assertEqual(template.includes, [os.path.join(directory, "partials", "header.html"), os.path.join(directory, "partials", "nav.html")])
+            # placeholders inside a partial are filled per page
+            self.assertEqual(template.render({"Title": "a", "Content": "b"}), "<header>a<nav>home</nav></header><main>b</main>")
+            self.assertEqual(template.render({"Title": "c"}), "<header>c<nav>home</nav></header><main></main>")
+
+            # a changed partial is picked up without touching the template
+            self.assertIs(template, load_template(path))
+            nav = os.path.join(directory, "partials", "nav.html")
+            with open(nav, "w") as file:
+                file.write("<nav>home | about</nav>")
+            os.utime(nav, ns=(0, 0))
+            self.assertEqual(load_template(path).render({"Title": "a"}), "<header>a<nav>home | about</nav></header><main></main>")
+
+    def test_include_cycle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, other in (("a.html", "b.html"), ("b.html", "a.html")):
+                with open(os.path.join(directory, name), "w") as file:
+                    file.write(f"{{{{> {other} }}}}")
+            with self.assertRaisesRegex(ValueError, "Include cycle"):
+                Template("{{> a.html }}", directory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,11 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("whatever", TextType.ITALIC, "https://www.boot.dev")
         node2 = TextNode("whatever", TextType.BOLD, "https://www.boot.dev")
         self.assertNotEqual(node, node2)
+    def test_slots(self):
+        node = TextNode("whatever", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
 
 
 if __name__ == "__main__":
@@ -10,23 +10,25 @@ class TextType(Enum):
 
 
 class TextNode:
-    def __init__(self, text, text_type, url=None):
+    __slots__ = ("text", "text_type", "url", "children")
+
+    # children holds the nested nodes of emphasis that contains other inline markup;
+    # text is then the plain text of those children
+    def __init__(self, text, text_type, url=None, children=None):
         self.text = text
         self.text_type = text_type
         self.url = url
+        self.children = children
     
     def __eq__(self, textNode2):
         if isinstance(textNode2, TextNode):
             return (self.text == textNode2.text and
                     self.text_type == textNode2.text_type and
-                    self.url == textNode2.url)
+                    self.url == textNode2.url and
+                    self.children == textNode2.children)
         return False
 
     def __repr__(self):
+        if self.children is not None:
+            return f"TextNode({self.text}, {self.text_type}, {self.url}, children: {self.children})"
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
-
-def main():
-    text1 = TextNode("What is this?", TextType.BOLD, "https://www.boot.dev")
-    # print(text1)
-
-main()
\ No newline at end of file